@@ -0,0 +1,65 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tass_scraper import ArticleExtractor
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_pages(fixtures_dir):
+    pages = [path.read_text(encoding="utf-8") for path in sorted(Path(fixtures_dir).glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No .html fixtures found in {fixtures_dir}")
+    return pages
+
+
+def benchmark(extract, pages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            extract(page)
+    elapsed = time.perf_counter() - start
+    return len(pages) * rounds / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TASS article parser micro-benchmark")
+    parser.add_argument("--fixtures",
+                        default=str(FIXTURES_DIR),
+                        metavar="DIR",
+                        help="Directory with saved TASS article pages (default: the synthetic pages in benchmarks/fixtures)")
+    parser.add_argument("--rounds",
+                        type=int,
+                        default=50,
+                        metavar="N",
+                        help="Number of passes over the fixtures per backend (default: 50)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    extractor = ArticleExtractor()
+    backends = {
+        "bs4": extractor.extract_bs4,
+        "lxml": extractor.extract_lxml,
+    }
+
+    for page in pages:
+        if extractor.extract_lxml(page) != extractor.extract_bs4(page):
+            print("warning: lxml and bs4 backends disagree on at least one fixture")
+            break
+
+    print(f"{len(pages)} pages x {args.rounds} rounds")
+    print(f"{'backend':<10}{'pages/sec':>12}")
+    baseline = None
+    for name, extract in backends.items():
+        rate = benchmark(extract, pages, args.rounds)
+        baseline = baseline or rate
+        print(f"{name:<10}{rate:>12.1f}  ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mock_server import MockTassServer, add_server_arguments, settings_from_args
+from tass_scraper import LatencyTracker, NewsScraper, NewsScraperConfig, aiohttp, httpx
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+def run_one(options, result_path):
+    config = NewsScraperConfig()
+    config.base_url = options["base_url"]
+    config.categories = options["categories"]
+    config.headlines_per_category = options["headlines"]
+    config.max_workers = options["workers"]
+    config.engine = options["engine"]
+    config.output_format = options["format"]
+    config.output_dir = options["output_dir"]
+    config.include_top_words = options["top_words"]
+    config.http2 = options["protocol"] == "http2"
+    config.ca_bundle = options["ca_bundle"]
+    config.stream = options["stream"]
+    config.min_delay = 0
+    config.max_delay = 0.001
+
+    scraper = NewsScraper(config)
+    scraper.latency = LatencyTracker(window=None)
+    scraper.user_agent_rotator.get_next_user_agent()
+
+    start = time.perf_counter()
+    scraper.run()
+    elapsed = time.perf_counter() - start
+
+    samples = sorted(scraper.latency.samples)
+    articles = sum(stats["articles"] for stats in scraper.metrics.categories.values())
+    result = {
+        "articles": articles,
+        "seconds": elapsed,
+        "articles_per_sec": articles / elapsed,
+        "p50_ms": None if not samples else percentile(samples, 50) * 1000,
+        "p95_ms": None if not samples else percentile(samples, 95) * 1000,
+        "p99_ms": None if not samples else percentile(samples, 99) * 1000,
+        "retries": scraper.metrics.retries,
+        "connections": scraper.metrics.connections.totals()["connections"],
+        "peak_rss_mb": peak_rss_mb(),
+        "errors": scraper.errors_occurred
+    }
+    Path(result_path).write_text(json.dumps(result), encoding="utf-8")
+
+
+def run_isolated(options, work_dir):
+    result_path = Path(work_dir) / "result.json"
+    result_path.unlink(missing_ok=True)
+    subprocess.run([sys.executable, __file__, "--child", json.dumps(options), str(result_path)],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    if not result_path.exists():
+        return None
+    return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+def format_value(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        run_one(json.loads(sys.argv[2]), sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description="TASS scraper throughput benchmark against a local mock server")
+    parser.add_argument("--workers",
+                        type=int,
+                        nargs="+",
+                        default=[2, 8, 32],
+                        metavar="N",
+                        help="Worker counts to benchmark (default: 2 8 32)")
+    parser.add_argument("--engines",
+                        nargs="+",
+                        default=["threads", "async"],
+                        choices=["threads", "async"],
+                        help="Fetch engines to benchmark (default: threads async)")
+    parser.add_argument("--protocols",
+                        nargs="+",
+                        default=["http1"],
+                        choices=["http1", "http2"],
+                        help="HTTP versions to benchmark with the threads engine, http2 implies --tls (default: http1)")
+    parser.add_argument("--formats",
+                        nargs="+",
+                        default=["json"],
+                        choices=["json", "jsonl", "csv"],
+                        help="Output formats to benchmark (default: json)")
+    parser.add_argument("--headlines",
+                        type=int,
+                        default=100,
+                        metavar="N",
+                        help="Headlines per category in every run (default: 100)")
+    parser.add_argument("--categories",
+                        nargs="+",
+                        default=["politics", "world"],
+                        help="Categories scraped in every run (default: politics world)")
+    parser.add_argument("--top-words",
+                        action="store_true",
+                        help="Enable top words analysis in every run")
+    parser.add_argument("--stream",
+                        action="store_true",
+                        help="Stop article downloads early in every run (scraper --stream)")
+    parser.add_argument("--save",
+                        metavar="FILE",
+                        help="Also write the results as JSON to FILE")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    engines = args.engines
+    if "async" in engines and aiohttp is None:
+        print("aiohttp is not installed, skipping the async engine")
+        engines = [engine for engine in engines if engine != "async"]
+
+    protocols = args.protocols
+    if "http2" in protocols and httpx is None:
+        print("httpx with HTTP/2 support is not installed, skipping http2")
+        protocols = [protocol for protocol in protocols if protocol != "http2"]
+
+    settings = settings_from_args(args)
+    settings.tls = args.tls or "http2" in protocols
+    server = MockTassServer(("127.0.0.1", 0), settings)
+    server.start()
+    print(f"mock server: {server.base_url}, latency {args.latency}s ±{args.jitter}s, 429 rate {args.rate_429}, "
+          f"5xx rate {args.rate_5xx}, max list size {args.max_list_size}, seed {args.seed}")
+    print(f"{len(args.categories)} categories x {args.headlines} headlines per run, top words {'on' if args.top_words else 'off'}, "
+          f"streaming {'on' if args.stream else 'off'}")
+    print()
+    print(f"{'engine':<9}{'proto':<7}{'format':<7}{'workers':>8}{'articles':>10}{'art/sec':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'retries':>9}{'conns':>7}{'RSS MB':>9}")
+
+    runs = [(engine, protocol, output_format, workers)
+            for engine, protocol, output_format, workers in itertools.product(engines, protocols, args.formats, args.workers)
+            if engine == "threads" or protocol == "http1"]
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for engine, protocol, output_format, workers in runs:
+            options = {
+                "base_url": server.base_url,
+                "categories": args.categories,
+                "headlines": args.headlines,
+                "workers": workers,
+                "engine": engine,
+                "protocol": protocol,
+                "ca_bundle": server.certfile,
+                "format": output_format,
+                "output_dir": str(Path(work_dir) / "output"),
+                "top_words": args.top_words,
+                "stream": args.stream
+            }
+            result = run_isolated(options, work_dir)
+            if result is None:
+                print(f"{engine:<9}{protocol:<7}{output_format:<7}{workers:>8}  run failed")
+                continue
+
+            print(f"{engine:<9}{protocol:<7}{output_format:<7}{workers:>8}{result['articles']:>10}"
+                  f"{result['articles_per_sec']:>10.1f}{format_value(result['p50_ms'], '>9.1f')}"
+                  f"{format_value(result['p95_ms'], '>9.1f')}{format_value(result['p99_ms'], '>9.1f')}"
+                  f"{result['retries']:>9}{result['connections']:>7}{format_value(result['peak_rss_mb'], '>9.1f')}"
+                  f"{'  (errors)' if result['errors'] else ''}")
+            results.append({"engine": engine, "protocol": protocol, "format": output_format, "workers": workers, **result})
+
+    server.shutdown()
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=4), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
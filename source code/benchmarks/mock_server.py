@@ -0,0 +1,375 @@
+import argparse
+import heapq
+import itertools
+import json
+import random
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:
+    h2 = None
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+BASE_TIMESTAMP = 1735000000
+
+
+class MockSettings:
+
+    def __init__(self):
+        self.latency = 0.05
+        self.jitter = 0.02
+        self.rate_429 = 0.0
+        self.rate_5xx = 0.0
+        self.max_list_size = 100
+        self.padding_kb = 0
+        self.seed = 1
+        self.fixtures_dir = FIXTURES_DIR
+        self.tls = False
+        self.cert_dir = None
+
+
+class MockTassServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address, settings):
+        super().__init__(address, MockTassHandler)
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.random_lock = threading.Lock()
+        self.pages = [path.read_text(encoding="utf-8") for path in sorted(Path(settings.fixtures_dir).glob("*.html"))]
+        if not self.pages:
+            raise SystemExit(f"No .html fixtures found in {settings.fixtures_dir}")
+        self.padding = f"<!-- {'x' * (settings.padding_kb * 1024)} -->" if settings.padding_kb else ""
+        self.requests = 0
+        self.connections = 0
+        self.http2_connections = 0
+        self.certfile = None
+        self.ssl_context = None
+        if settings.tls:
+            self.certfile, keyfile = generate_certificate(settings.cert_dir or tempfile.mkdtemp(prefix="mock_tass_"))
+            self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.ssl_context.load_cert_chain(self.certfile, keyfile)
+            self.ssl_context.set_alpn_protocols(["h2", "http/1.1"] if h2 is not None else ["http/1.1"])
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"{'https' if self.ssl_context else 'http'}://{host}:{port}"
+
+    def draw(self):
+        with self.random_lock:
+            self.requests += 1
+            return self.random.random(), self.random.uniform(-1, 1)
+
+    def plan_response(self):
+        settings = self.settings
+        roll, spread = self.draw()
+        delay = max(settings.latency + spread * settings.jitter, 0)
+        if roll < settings.rate_429:
+            return delay, (429, b"Too many requests", "text/plain", {"Retry-After": "1"})
+        if roll < settings.rate_429 + settings.rate_5xx:
+            return delay, (503, b"Service unavailable", "text/plain", None)
+        return delay, None
+
+    def respond(self, method, path, body):
+        if method == "POST":
+            if path != "/userApi/categoryNewsList":
+                return 404, b"Not found", "text/plain", None
+            payload = json.loads(body)
+            exclude_ids = set(filter(None, str(payload.get("excludeNewsIds", "")).split(",")))
+            news_list = self.news_list(int(payload["sectionId"]), int(payload["limit"]), exclude_ids)
+            return 200, json.dumps({"newsList": news_list}).encode(), "application/json", None
+        
+        try:
+            news_id = int(path.rstrip("/").rsplit("/", 1)[-1])
+        except ValueError:
+            return 404, b"Not found", "text/plain", None
+        return 200, self.article_page(news_id).encode(), "text/html; charset=utf-8", None
+
+    def news_list(self, section_id, limit, exclude_ids):
+        items = []
+        offset = 0
+        while len(items) < min(limit, self.settings.max_list_size):
+            news_id = section_id * 100000 + offset
+            offset += 1
+            if str(news_id) in exclude_ids:
+                continue
+            items.append({
+                "id": news_id,
+                "title": f"Mock headline {news_id}",
+                "lead": f"Mock lead {news_id}",
+                "date": BASE_TIMESTAMP - offset * 600,
+                "link": f"/section{section_id}/{news_id}"
+            })
+        return items
+
+    def article_page(self, news_id):
+        return self.pages[news_id % len(self.pages)] + self.padding
+
+    def get_request(self):
+        sock, address = self.socket.accept()
+        if self.ssl_context is not None:
+            sock = self.ssl_context.wrap_socket(sock, server_side=True, do_handshake_on_connect=False)
+        return sock, address
+
+    def finish_request(self, request, client_address):
+        with self.random_lock:
+            self.connections += 1
+        if self.ssl_context is not None:
+            try:
+                request.do_handshake()
+            except (ssl.SSLError, OSError):
+                return
+            if request.selected_alpn_protocol() == "h2":
+                with self.random_lock:
+                    self.http2_connections += 1
+                return MockHttp2Connection(self, request).run()
+        super().finish_request(request, client_address)
+
+    def handle_error(self, request, client_address):
+        pass
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class MockTassHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.handle_request("POST", body)
+
+    def do_GET(self):
+        self.handle_request("GET", b"")
+
+    def handle_request(self, method, body):
+        delay, error = self.server.plan_response()
+        time.sleep(delay)
+        self.send_body(*(error or self.server.respond(method, self.path, body)))
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockHttp2Connection:
+
+    def __init__(self, server, sock):
+        self.server = server
+        self.sock = sock
+        self.connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.streams = {}
+        self.outgoing = {}
+        self.scheduled = []
+        self.sequence = itertools.count()
+
+    def run(self):
+        self.connection.initiate_connection()
+        self.flush()
+        while True:
+            timeout = None
+            if self.scheduled:
+                timeout = max(self.scheduled[0][0] - time.monotonic(), 0.001)
+            self.sock.settimeout(timeout)
+            try:
+                data = self.sock.recv(65535)
+                if not data:
+                    return
+                events = self.connection.receive_data(data)
+            except socket.timeout:
+                events = []
+            except (OSError, h2.exceptions.ProtocolError):
+                return
+
+            for event in events:
+                if isinstance(event, h2.events.RequestReceived):
+                    self.streams[event.stream_id] = (dict(event.headers), bytearray())
+                elif isinstance(event, h2.events.DataReceived):
+                    self.streams[event.stream_id][1].extend(event.data)
+                    self.connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    self.schedule(event.stream_id)
+                elif isinstance(event, h2.events.WindowUpdated):
+                    for stream_id in list(self.outgoing):
+                        self.send_data(stream_id)
+                elif isinstance(event, h2.events.StreamReset):
+                    self.outgoing.pop(event.stream_id, None)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    self.flush()
+                    return
+
+            now = time.monotonic()
+            while self.scheduled and self.scheduled[0][0] <= now:
+                _, _, stream_id, response = heapq.heappop(self.scheduled)
+                self.send_response(stream_id, *response)
+            if not self.flush():
+                return
+
+    def schedule(self, stream_id):
+        headers, body = self.streams.pop(stream_id)
+        delay, error = self.server.plan_response()
+        response = error or self.server.respond(headers[":method"], headers[":path"], bytes(body))
+        heapq.heappush(self.scheduled, (time.monotonic() + delay, next(self.sequence), stream_id, response))
+
+    def send_response(self, stream_id, status, body, content_type, headers=None):
+        response_headers = [(":status", str(status)), ("content-type", content_type), ("content-length", str(len(body)))]
+        response_headers += [(name.lower(), value) for name, value in (headers or {}).items()]
+        try:
+            self.connection.send_headers(stream_id, response_headers, end_stream=not body)
+        except h2.exceptions.ProtocolError:
+            return
+        if body:
+            self.outgoing[stream_id] = memoryview(body)
+            self.send_data(stream_id)
+
+    def send_data(self, stream_id):
+        data = self.outgoing[stream_id]
+        try:
+            while data:
+                size = min(len(data), self.connection.local_flow_control_window(stream_id),
+                           self.connection.max_outbound_frame_size)
+                if size <= 0:
+                    break
+                self.connection.send_data(stream_id, data[:size].tobytes(), end_stream=size == len(data))
+                data = data[size:]
+        except h2.exceptions.ProtocolError:
+            data = None
+        if data:
+            self.outgoing[stream_id] = data
+        else:
+            del self.outgoing[stream_id]
+
+    def flush(self):
+        data = self.connection.data_to_send()
+        if not data:
+            return True
+        self.sock.settimeout(None)
+        try:
+            self.sock.sendall(data)
+        except OSError:
+            return False
+        return True
+
+
+def generate_certificate(directory):
+    certfile = Path(directory) / "mock_tass_cert.pem"
+    keyfile = Path(directory) / "mock_tass_key.pem"
+    if not certfile.exists():
+        try:
+            subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "30",
+                            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost",
+                            "-keyout", str(keyfile), "-out", str(certfile)],
+                           check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise SystemExit(f"Could not create a self-signed certificate with openssl: {e}")
+    return str(certfile), str(keyfile)
+
+
+def add_server_arguments(parser):
+    defaults = MockSettings()
+    parser.add_argument("--latency",
+                        type=float,
+                        default=defaults.latency,
+                        metavar="SEC",
+                        help=f"Base response time in seconds (default: {defaults.latency})")
+    parser.add_argument("--jitter",
+                        type=float,
+                        default=defaults.jitter,
+                        metavar="SEC",
+                        help=f"Maximum random deviation from --latency in seconds (default: {defaults.jitter})")
+    parser.add_argument("--rate-429",
+                        type=float,
+                        default=defaults.rate_429,
+                        metavar="P",
+                        help="Share of requests answered with 429 and Retry-After: 1 (default: 0)")
+    parser.add_argument("--rate-5xx",
+                        type=float,
+                        default=defaults.rate_5xx,
+                        metavar="P",
+                        help="Share of requests answered with 503 (default: 0)")
+    parser.add_argument("--max-list-size",
+                        type=int,
+                        default=defaults.max_list_size,
+                        metavar="N",
+                        help=f"Maximum number of headlines returned per news list request (default: {defaults.max_list_size})")
+    parser.add_argument("--padding-kb",
+                        type=int,
+                        default=defaults.padding_kb,
+                        metavar="KB",
+                        help="Extra kilobytes appended to every article page (default: 0)")
+    parser.add_argument("--seed",
+                        type=int,
+                        default=defaults.seed,
+                        help=f"Random seed for latency and error injection (default: {defaults.seed})")
+    parser.add_argument("--fixtures",
+                        default=str(FIXTURES_DIR),
+                        metavar="DIR",
+                        help="Directory with article pages to serve (default: benchmarks/fixtures)")
+    parser.add_argument("--tls",
+                        action="store_true",
+                        help="Serve HTTPS with a self-signed certificate, and HTTP/2 when the h2 package is installed")
+
+
+def settings_from_args(args):
+    settings = MockSettings()
+    settings.latency = args.latency
+    settings.jitter = args.jitter
+    settings.rate_429 = args.rate_429
+    settings.rate_5xx = args.rate_5xx
+    settings.max_list_size = args.max_list_size
+    settings.padding_kb = args.padding_kb
+    settings.seed = args.seed
+    settings.fixtures_dir = Path(args.fixtures)
+    settings.tls = args.tls
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for tass.com")
+    parser.add_argument("--port",
+                        type=int,
+                        default=8765,
+                        help="Port to listen on (default: 8765)")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockTassServer(("127.0.0.1", args.port), settings_from_args(args))
+    if server.certfile:
+        print(f"Serving mock TASS on {server.base_url} (use --base-url {server.base_url} --ca-bundle {server.certfile})")
+    else:
+        print(f"Serving mock TASS on {server.base_url} (use --base-url {server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{server.requests} requests on {server.connections} connections ({server.http2_connections} HTTP/2)")
+
+
+if __name__ == "__main__":
+    main()
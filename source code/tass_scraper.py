@@ -1,45 +1,237 @@
 import json
 import csv
 import logging
+import os
 import random
 import re
+import socket
+import sqlite3
+import ssl
 import sys
 import time
+import uuid
+import calendar
 import datetime
 import argparse
-from collections import Counter
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import gzip
+import hashlib
+import heapq
+import importlib.util
+import itertools
+import mmap
+import struct
+import threading
+import zlib
+import multiprocessing
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
 from pathlib import Path
+from queue import Empty, SimpleQueue
+from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup
+from lxml import etree
 from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import MaxRetryError
 from urllib3.util.retry import Retry
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+if httpx is not None and importlib.util.find_spec("h2") is None:
+    httpx = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+RETRY_BACKOFF_FACTOR = 2
+RETRY_BACKOFF_MAX = 120
+HOP_BY_HOP_HEADERS = frozenset(["connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"])
+
+STOP_WORDS = frozenset([
+    "i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", "your",
+    "yours", "yourself", "yourselves", "he", "him", "his", "himself", "she",
+    "her", "hers", "herself", "it", "its", "itself", "they", "them", "their",
+    "theirs", "themselves", "what", "which", "who", "whom", "this", "that",
+    "these", "those", "am", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "having", "do", "does", "did", "doing", "a", "an",
+    "the", "and", "but", "if", "or", "because", "as", "until", "while", "of",
+    "at", "by", "for", "with", "about", "against", "between", "into", "through",
+    "during", "before", "after", "above", "below", "to", "from", "up", "down",
+    "in", "out", "on", "off", "over", "under", "again", "further", "then",
+    "once", "here", "there", "when", "where", "why", "how", "all", "any",
+    "both", "each", "few", "more", "most", "other", "some", "such", "no",
+    "nor", "not", "only", "own", "same", "so", "than", "too", "very", "can",
+    "will", "just", "now", "should", "would", "could", "might", "must",
+    "shall", "may", "also", "still", "yet", "ever", "never"
+])
+TOKEN_PATTERN = re.compile(r"\b\w+'\w+|\w+\b")
+
 
 class NewsScraperConfig:
 
     def __init__(self):
         self.headlines_per_category = 20
+        self.page_size = 100
         self.categories = ["politics", "world", "economy", "defense", "science",
                             "emergencies", "society", "pressreview", "sports"]
         self.max_workers = 2
+        self.auto_workers = False
+        self.min_workers = 1
+        self.max_auto_workers = 32
+        self.parse_procs = 0
         self.output_dir = "news_data"
         self.include_top_words = False
+        self.term_report = False
+        self.ngrams = 1
+        self.report_top = 50
         self.min_delay = 0.2
         self.max_delay = 1.0
         self.max_retries = 3
+        self.connect_timeout = 10
+        self.read_timeout = 30
+        self.deadline = None
+        self.hedge_percentile = None
         self.use_csv = False
+        self.output_format = "json"
+        self.parser = "auto"
+        self.stream = False
+        self.engine = "threads"
+        self.base_url = "https://tass.com"
+        self.rate = None
+        self.burst = 1
+        self.jitter = 0.2
+        self.rate_per_host = False
+        self.http2 = False
+        self.ca_bundle = None
+        self.incremental = False
+        self.build_index = False
+        self.near_duplicates = False
+        self.similarity = 0.8
+        self.watch = False
+        self.watch_interval = 60
+        self.watch_max_interval = 600
+        self.join = None
+        self.lease_seconds = 120
+        self.backfill_since = None
+        self.backfill_until = None
+        self.window_days = 7
+        self.archive_shard_mb = 64
+        self.use_cache = False
+        self.cache_ttl = 86400
+        self.cache_max_mb = 500
 
     def validate(self):
         if self.headlines_per_category <= 0:
             raise ValueError("headlines_per_category must be positive")
         if self.max_workers <= 0:
             raise ValueError("max_workers must be positive")
+        if self.min_workers <= 0 or self.max_auto_workers < self.min_workers:
+            raise ValueError("min_workers must be positive and not greater than max_auto_workers")
+        if self.ngrams < 1:
+            raise ValueError("ngrams must be at least 1")
+        if self.report_top <= 0:
+            raise ValueError("report_top must be positive")
+        if self.connect_timeout <= 0 or self.read_timeout <= 0:
+            raise ValueError("timeouts must be positive")
+        if self.deadline is not None and self.deadline <= 0:
+            raise ValueError("deadline must be positive")
+        if self.hedge_percentile is not None and not 0 < self.hedge_percentile < 100:
+            raise ValueError("hedge_percentile must be between 0 and 100")
+        if self.parse_procs < 0:
+            raise ValueError("parse_procs must not be negative")
+        if self.page_size <= 0:
+            raise ValueError("page_size must be positive")
         if self.min_delay >= self.max_delay:
             raise ValueError("min_delay must be less than max_delay")
         if not self.categories:
             raise ValueError("at least one category must be specified")
+        if self.output_format not in ("json", "csv", "jsonl", "parquet", "archive"):
+            raise ValueError("output_format must be one of 'json', 'csv', 'jsonl', 'parquet' or 'archive'")
+        if self.archive_shard_mb <= 0:
+            raise ValueError("archive_shard_mb must be positive")
+        if self.output_format == "parquet" and pyarrow is None:
+            raise ValueError("parquet output requires the pyarrow package (pip install pyarrow)")
+        if self.parser not in ArticleExtractor.BACKENDS:
+            raise ValueError(f"parser must be one of {', '.join(ArticleExtractor.BACKENDS)}")
+        if self.engine not in ("threads", "async"):
+            raise ValueError("engine must be either 'threads' or 'async'")
+        if self.engine == "async" and aiohttp is None:
+            raise ValueError("the async engine requires the aiohttp package (pip install aiohttp)")
+        if not 0.5 <= self.similarity <= 1:
+            raise ValueError("similarity must be between 0.5 and 1")
+        if self.near_duplicates and numpy is None:
+            raise ValueError("near-duplicate detection requires the numpy package (pip install numpy)")
+        if self.http2 and httpx is None:
+            raise ValueError("HTTP/2 requires the httpx package with HTTP/2 support (pip install httpx[http2])")
+        if self.http2 and self.engine != "threads":
+            raise ValueError("HTTP/2 uses the threads engine")
+        if self.ca_bundle is not None and not os.path.isfile(self.ca_bundle):
+            raise ValueError(f"CA bundle {self.ca_bundle} does not exist")
+        if self.rate is not None and self.rate <= 0:
+            raise ValueError("rate must be positive")
+        if self.burst < 1:
+            raise ValueError("burst must be at least 1")
+        if self.jitter < 0:
+            raise ValueError("jitter must not be negative")
+        if self.cache_ttl < 0:
+            raise ValueError("cache_ttl must not be negative")
+        if self.cache_max_mb <= 0:
+            raise ValueError("cache_max_mb must be positive")
+        if self.watch_interval <= 0:
+            raise ValueError("watch_interval must be positive")
+        if self.watch_max_interval < self.watch_interval:
+            raise ValueError("watch_max_interval must not be less than watch_interval")
+        if self.watch and (self.use_csv or self.output_format in ("csv", "parquet", "archive")):
+            raise ValueError("watch mode writes JSON Lines files and cannot be combined with CSV, Parquet or archive output")
+        if self.watch and (self.deadline or self.term_report):
+            raise ValueError("watch mode cannot be combined with a deadline or a term report")
+        if self.lease_seconds <= 0:
+            raise ValueError("lease_seconds must be positive")
+        if self.join and (self.watch or self.deadline or self.term_report or self.incremental):
+            raise ValueError("join cannot be combined with watch mode, a deadline, a term report or incremental runs")
+        if self.join and self.engine != "threads":
+            raise ValueError("join uses the threads engine")
+        if (self.backfill_since is None) != (self.backfill_until is None):
+            raise ValueError("backfill needs both a first and a last day")
+        if self.backfill_since and self.backfill_since > self.backfill_until:
+            raise ValueError("the first backfill day must not be after the last one")
+        if self.window_days <= 0:
+            raise ValueError("window_days must be positive")
+        if self.backfill_since and (self.watch or self.join or self.term_report or self.incremental):
+            raise ValueError("backfill cannot be combined with watch mode, join, a term report or incremental runs")
+        if self.backfill_since and (self.engine != "threads" or self.output_format == "archive"):
+            raise ValueError("backfill uses the threads engine and writes JSON, JSON Lines, CSV or Parquet files")
 
 
 
@@ -77,14 +269,24 @@ class ProgressBar:
         self.total = total
         self.length = length
         self.start_time = time.time()
+        self.drawn = False
         
 
     def update(self, progress):
         if progress >= self.total:
             sys.stdout.write('\r' + self._format_bar(progress) + '\n')
+            self.drawn = False
         else:
             sys.stdout.write('\r' + self._format_bar(progress))
+            self.drawn = True
         sys.stdout.flush()
+
+
+    def interrupt(self):
+        if self.drawn:
+            sys.stdout.write('\n')
+            sys.stdout.flush()
+            self.drawn = False
         
 
     def _format_bar(self, progress):
@@ -123,17 +325,79 @@ class ColoredLogger(logging.Logger):
 
 class UserAgentRotator:
 
-    def __init__(self, logger=None):
+    LOOKUP_TIMEOUT = 5
+    REFRESH_INTERVAL = 86400
+
+
+    def __init__(self, logger=None, cache_path=None, refresh_interval=REFRESH_INTERVAL):
         self.logger = logger or logging.getLogger(__name__)
-        self.chrome_versions = self._get_chrome_versions()
-        self.firefox_versions = self._get_firefox_versions()
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.refresh_interval = refresh_interval
+        self.chrome_versions = []
+        self.firefox_versions = []
+        self.user_agents = []
+        self.usage_counts = {}
+        self.available = []
+        self.lock = threading.Lock()
+
+
+    def _load(self):
+        cache = self._read_cache()
+        self.chrome_versions = self._cached_versions(cache, "chrome", self._get_chrome_versions)
+        self.firefox_versions = self._cached_versions(cache, "firefox", self._get_firefox_versions)
+        self._write_cache(cache)
         self.user_agents = self._generate_user_agents()
         self.usage_counts = {ua: 0 for ua in self.user_agents}
 
 
+    def _cached_versions(self, cache, browser, fetch):
+        entry = cache.get(browser)
+        if entry and time.time() - entry["fetched_at"] < self.refresh_interval:
+            return entry["versions"]
+        
+        versions = fetch()
+        if versions is not None:
+            cache[browser] = {"fetched_at": time.time(), "versions": versions}
+            return versions
+        if entry:
+            return entry["versions"]
+        return self._fallback_versions(browser)
+
+
+    def _read_cache(self):
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            return json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+
+    def _write_cache(self, cache):
+        if self.cache_path is None or not cache:
+            return
+        try:
+            write_json_atomic(self.cache_path, cache)
+        except OSError as e:
+            self.logger.warning(f"Could not write browser version cache: {e}")
+
+
+    def _fallback_versions(self, browser):
+        if browser == "chrome":
+            return ['131.0.0.0', '131.0.0.0', '131.0.0.0', '131.0.0.0','131.0.0.0',
+                    '130.0.0.0', '130.0.0.0', '130.0.0.0', '130.0.0.0', '129.0.0.0',
+                    '131.0.0.0', '131.0.0.0', '131.0.0.0', '131.0.0.0', '131.0.0.0',
+                    '130.0.0.0', '130.0.0.0', '130.0.0.0', '130.0.0.0', '129.0.0.0']
+        return ['133.0', '133.0', '133.0', '133.0', '133.0',
+                '133.0', '133.0', '133.0', '133.0', '133.0',
+                '132.0', '132.0', '132.0', '132.0', '132.0',
+                '132.0', '132.0', '132.0', '131.0', '131.0']
+
+
     def _get_chrome_versions(self):
         try:
-            response = requests.get('https://versionhistory.googleapis.com/v1/chrome/platforms/win/channels/stable/versions')
+            response = requests.get('https://versionhistory.googleapis.com/v1/chrome/platforms/win/channels/stable/versions',
+                                    timeout=self.LOOKUP_TIMEOUT)
             data = response.json()
             versions = []
             for i in range(2, 30, 3):
@@ -142,15 +406,13 @@ class UserAgentRotator:
                 versions.append(version)
             return versions * 2
         except Exception:
-            return ['131.0.0.0', '131.0.0.0', '131.0.0.0', '131.0.0.0','131.0.0.0',
-                    '130.0.0.0', '130.0.0.0', '130.0.0.0', '130.0.0.0', '129.0.0.0',
-                    '131.0.0.0', '131.0.0.0', '131.0.0.0', '131.0.0.0', '131.0.0.0',
-                    '130.0.0.0', '130.0.0.0', '130.0.0.0', '130.0.0.0', '129.0.0.0']
+            return None
 
 
     def _get_firefox_versions(self):
         try:
-            response = requests.get('https://product-details.mozilla.org/1.0/firefox_versions.json')
+            response = requests.get('https://product-details.mozilla.org/1.0/firefox_versions.json',
+                                    timeout=self.LOOKUP_TIMEOUT)
             current_major = int(response.json()["LATEST_FIREFOX_VERSION"].split('.')[0])
             
             versions = []
@@ -160,10 +422,7 @@ class UserAgentRotator:
             
             return versions
         except Exception:
-            return ['133.0', '133.0', '133.0', '133.0', '133.0',
-                    '133.0', '133.0', '133.0', '133.0', '133.0',
-                    '132.0', '132.0', '132.0', '132.0', '132.0',
-                    '132.0', '132.0', '132.0', '131.0', '131.0']
+            return None
 
 
     def _generate_user_agents(self):
@@ -231,318 +490,4240 @@ class UserAgentRotator:
 
 
     def get_next_user_agent(self):
-        min_usage = min(self.usage_counts.values())
-        least_used = [ua for ua, count in self.usage_counts.items() if count == min_usage]
-        
-        selected_agent = random.choice(least_used)
-        self.usage_counts[selected_agent] += 1
+        with self.lock:
+            if not self.user_agents:
+                self._load()
+            
+            if not self.available:
+                self.available = list(self.usage_counts)
+                random.shuffle(self.available)
+            
+            selected_agent = self.available.pop()
+            self.usage_counts[selected_agent] += 1
         
         return selected_agent
 
 
 
 
-class NewsScraper:
+class RateLimiter:
 
-    CATEGORY_MAP = {
-        "politics": 4954,
-        "world": 4844,
-        "economy": 4845,
-        "defense": 4953,
-        "science": 4957,
-        "emergencies": 4992,
-        "society": 4956,
-        "pressreview": 4981,
-        "sports": 4869
-    }
+    def __init__(self, rate, burst=1, jitter=0.0, per_host=False):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self.per_host = per_host
+        self.buckets = {}
+        self.lock = threading.Lock()
 
 
-    def __init__(self, config):
-        self.config = config
-        self.output_dir = Path(config.output_dir).resolve()
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        (self.output_dir / "logs").mkdir(parents=True, exist_ok=True)
-        self.logger = self._setup_logger()
-        self.session = self._setup_session()
-        self.user_agent_rotator = UserAgentRotator(self.logger)
-        self.errors_occurred = False
+    def reserve(self, url):
+        key = urlparse(url).netloc if self.per_host else None
+        with self.lock:
+            now = time.monotonic()
+            tokens = self._tokens(key, now) - 1
+            self.buckets[key] = (tokens, now)
         
+        delay = -tokens / self.rate if tokens < 0 else 0
+        return delay + random.uniform(0, self.jitter)
 
-    def _setup_session(self):
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=self.config.max_retries,
-            backoff_factor=2,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET", "POST"]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
 
+    def next_free(self, url):
+        key = urlparse(url).netloc if self.per_host else None
+        with self.lock:
+            tokens = self._tokens(key, time.monotonic()) - 1
+        return -tokens / self.rate if tokens < 0 else 0
 
-    def _setup_logger(self):
-        logging.setLoggerClass(ColoredLogger)
-        logger = logging.getLogger('NewsScraper')
-        logger.setLevel(logging.INFO)
-        
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_formatter = logging.Formatter('%(message)s')
-        console_handler.setFormatter(console_formatter)
-        
-        log_path = Path(self.config.output_dir) / 'logs' / 'scraper.log'
-        file_handler = logging.FileHandler(log_path)
-        file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(file_formatter)
-        
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
-        
-        return logger
-        
 
-    def get_top_words(self, text_data):
-        if not self.config.include_top_words:
-            return []
-            
-        stop_words = set([
-            "i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", "your", 
-            "yours", "yourself", "yourselves", "he", "him", "his", "himself", "she", 
-            "her", "hers", "herself", "it", "its", "itself", "they", "them", "their", 
-            "theirs", "themselves", "what", "which", "who", "whom", "this", "that", 
-            "these", "those", "am", "is", "are", "was", "were", "be", "been", "being", 
-            "have", "has", "had", "having", "do", "does", "did", "doing", "a", "an", 
-            "the", "and", "but", "if", "or", "because", "as", "until", "while", "of", 
-            "at", "by", "for", "with", "about", "against", "between", "into", "through", 
-            "during", "before", "after", "above", "below", "to", "from", "up", "down", 
-            "in", "out", "on", "off", "over", "under", "again", "further", "then", 
-            "once", "here", "there", "when", "where", "why", "how", "all", "any", 
-            "both", "each", "few", "more", "most", "other", "some", "such", "no", 
-            "nor", "not", "only", "own", "same", "so", "than", "too", "very", "can", 
-            "will", "just", "now", "should", "would", "could", "might", "must", 
-            "shall", "may", "also", "still", "yet", "ever", "never"
-        ])
-
-        words = re.findall(r"\b\w+'\w+|\w+\b", " ".join(text_data).lower())
-        words = [re.sub(r"'s$", "", word) for word in words if word != "s"]
-        filtered_words = [w for w in words if w not in stop_words and not w.isdigit()]
-        
-        return [{"word": word, "count": count} 
-                for word, count in Counter(filtered_words).most_common(10)]
+    def _tokens(self, key, now):
+        tokens, updated = self.buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
 
 
-    def fetch_article_content(self, article):
-        headers = {
-            "User-Agent": self.user_agent_rotator.get_next_user_agent(),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "DNT": "1",
-            "Connection": "keep-alive",
-        }
-        
-        time.sleep(random.uniform(self.config.min_delay, self.config.max_delay))
+
+
+class LatencyTracker:
+
+    def __init__(self, window=500, min_samples=20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.sorted_samples = []
+        self.new_samples = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self.lock = threading.Lock()
+
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.new_samples += 1
+
+
+    def percentile(self, percentile):
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            if self.new_samples >= 10 or not self.sorted_samples:
+                self.sorted_samples = sorted(self.samples)
+                self.new_samples = 0
+            position = min(len(self.sorted_samples) - 1, int(len(self.sorted_samples) * percentile / 100))
+            return self.sorted_samples[position]
+
+
+    def record_hedge(self, won=False):
+        with self.lock:
+            if won:
+                self.hedges_won += 1
+            else:
+                self.hedges += 1
+
+
+    def summary(self):
+        return f"Hedged {self.hedges} requests ({self.hedges_won} won by the duplicate)"
+
+
+
+
+class ConnectionStats:
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self.lock = threading.Lock()
+
+
+    def pool_classes(self):
+        stats = self
         
-        try:
-            response = self.session.get(article["link"], headers=headers)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "lxml")
-            contents = []
+        class CountingHTTPConnection(HTTPConnection):
+            def connect(self):
+                super().connect()
+                stats.record_connection(tls=False)
             
-            if header_lead := soup.select_one("div.news-header__lead"):
-                contents.append(header_lead.text.strip())
-                
-            for p in soup.select("div.text-block p"):
-                contents.append(p.text.strip())
-                
-            if not contents:
-                raise ValueError("No content found in article")
-                
-            article["content"] = contents
-            if self.config.include_top_words:
-                article["top_words"] = self.get_top_words(contents)
-            return article
+            def request(self, *args, **kwargs):
+                stats.record_request()
+                return super().request(*args, **kwargs)
+        
+        class CountingHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                super().connect()
+                stats.record_connection(tls=True)
             
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Network error while fetching {article['link']}: {e}")
-            self.errors_occurred = True
-            raise
-        except Exception as e:
-            self.logger.error(f"Error processing {article['link']}: {e}")
-            self.errors_occurred = True
-            raise
-
-
-    def get_news_list(self, category):
-        self.logger.info(f"Fetching news list for category: {category}")
+            def request(self, *args, **kwargs):
+                stats.record_request()
+                return super().request(*args, **kwargs)
         
-        headers = {
-            "Host": "tass.com",
-            "User-Agent": self.user_agent_rotator.get_next_user_agent(),
-            "Accept": "application/json",
-            "Content-Type": "application/json;charset=utf-8",
-            "Origin": "https://tass.com",
-            "DNT": "1",
-            "Referer": f"https://tass.com/{category}",
+        return {
+            "http": type("CountingHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": CountingHTTPConnection}),
+            "https": type("CountingHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": CountingHTTPSConnection})
         }
 
-        payload = {
-            "sectionId": self.CATEGORY_MAP[category],
-            "limit": self.config.headlines_per_category,
-            "type": "all",
-            "imageSize": 434
-        }
 
-        try:
-            response = self.session.post(
-                "https://tass.com/userApi/categoryNewsList",
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            
-            news_list = response.json()["newsList"]
-            return [{
-                "title": item["title"],
-                "description": item["lead"],
-                "date": str(datetime.datetime.fromtimestamp(item["date"])),
-                "link": f"https://tass.com{item['link']}"
-            } for item in news_list]
-            
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Network error while fetching news list for {category}: {e}")
-            self.errors_occurred = True
-            raise
-        except Exception as e:
-            self.logger.error(f"Error processing news list for {category}: {e}")
-            self.errors_occurred = True
-            raise
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
 
 
-    def save_to_csv(self, articles, output_path):
-        if not articles:
-            return
+    def record_connection(self, tls):
+        with self.lock:
+            self.connections += 1
+            if tls:
+                self.tls_handshakes += 1
+
 
-        flattened_articles = []
-        for article in articles:
-            flat_article = {
-                'title': article['title'],
-                'description': article['description'],
-                'date': article['date'],
-                'link': article['link'],
-                'content': ' '.join(article['content'])
+    def totals(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "reused": max(self.requests - self.connections, 0),
+                "tls_handshakes": self.tls_handshakes
             }
-            
-            if self.config.include_top_words and 'top_words' in article:
-                for i, word_info in enumerate(article['top_words'], 1):
-                    flat_article[f'top_word_{i}'] = word_info['word']
-                    flat_article[f'top_word_{i}_count'] = word_info['count']
 
-            flattened_articles.append(flat_article)
 
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            if flattened_articles:
-                writer = csv.DictWriter(f, fieldnames=flattened_articles[0].keys())
-                writer.writeheader()
-                writer.writerows(flattened_articles)
+    def summary(self):
+        totals = self.totals()
+        return (f"Sent {totals['requests']} requests over {totals['connections']} connections "
+                f"({totals['reused']} reused, {totals['tls_handshakes']} TLS handshakes)")
 
 
-    def process_category(self, category):
-        try:
-            news_list = self.get_news_list(category)
-            progress_bar = ProgressBar(len(news_list))
-            processed_articles = []
-            
-            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-                future_to_article = {
-                    executor.submit(self.fetch_article_content, article): article 
-                    for article in news_list
-                }
-                
-                for i, future in enumerate(future_to_article, 1):
-                    try:
-                        article = future.result()
-                        processed_articles.append(article)
-                        progress_bar.update(i)
-                    except Exception as e:
-                        self.logger.error(f"Error processing article: {e}")
-                        self.errors_occurred = True
-            
-            extension = 'csv' if self.config.use_csv else 'json'
-            output_path = Path(self.config.output_dir) / f"{category}_{self.config.headlines_per_category}.{extension}"
-            
-            if self.config.use_csv:
-                self.save_to_csv(processed_articles, output_path)
-            else:
-                with open(output_path, "w", encoding='utf-8') as f:
-                    json.dump(processed_articles, f, indent=4, ensure_ascii=False)
-                
-            self.logger.info(f"Successfully processed {len(processed_articles)} articles for {category}")
-                
-        except Exception as e:
-            self.logger.error(f"Error processing category {category}: {e}")
-            self.errors_occurred = True
 
-    def run(self):
-        self.config.validate()
-        for category in self.config.categories:
-            if category in self.CATEGORY_MAP:
-                self.process_category(category)
-                print()
-            else:
-                self.logger.error(f"Invalid category: {category}")
-                self.errors_occurred = True
-                
-        if not self.errors_occurred:
-            self.logger.info(Colors.green("All tasks have finished successfully."))
-        else:
-            self.logger.error("Some tasks failed during execution.")
 
+class RunMetrics:
 
+    STAGES = ("list_fetch", "download", "parse", "top_words", "write")
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    PREFIX = "tass_scraper"
 
 
-def main():
-    class CustomFormatter(argparse.HelpFormatter):
+    def __init__(self):
+        self.histograms = {stage: [0] * (len(self.BUCKETS) + 1) for stage in self.STAGES}
+        self.sums = dict.fromkeys(self.STAGES, 0.0)
+        self.maxima = dict.fromkeys(self.STAGES, 0.0)
+        self.bytes_received = 0
+        self.retries = 0
+        self.status_codes = Counter()
+        self.categories = {}
+        self.connections = ConnectionStats()
+        self.streams = {"downloads": 0, "stopped_early": 0, "bytes_skipped": 0}
+        self.start_time = time.time()
+        self.lock = threading.Lock()
 
-        def __init__(self, prog):
-            super().__init__(prog, max_help_position=50, width=100)
+
+    def observe(self, stage, seconds):
+        bucket = len(self.BUCKETS)
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                bucket = i
+                break
+        with self.lock:
+            self.histograms[stage][bucket] += 1
+            self.sums[stage] += seconds
+            self.maxima[stage] = max(self.maxima[stage], seconds)
+
+
+    def record_response(self, status, size):
+        with self.lock:
+            self.status_codes[status] += 1
+            self.bytes_received += size
+
+
+    def record_retry(self, status=None):
+        with self.lock:
+            self.retries += 1
+            if status is not None:
+                self.status_codes[status] += 1
+
+
+    def record_stream(self, stopped_early, bytes_skipped=0):
+        with self.lock:
+            self.streams["downloads"] += 1
+            if stopped_early:
+                self.streams["stopped_early"] += 1
+                self.streams["bytes_skipped"] += bytes_skipped
+
+
+    def record_category(self, category, articles, seconds):
+        with self.lock:
+            self.categories[category] = {
+                "articles": articles,
+                "seconds": round(seconds, 3),
+                "articles_per_sec": round(articles / seconds, 2)
+            }
+
+
+    def quantile(self, stage, q):
+        counts = self.histograms[stage]
+        total = sum(counts)
+        if not total:
+            return None
+        seen = 0
+        for bound, count in zip(self.BUCKETS, counts):
+            seen += count
+            if seen >= q * total:
+                return min(bound, self.maxima[stage])
+        return self.maxima[stage]
+
+
+    def summary(self):
+        with self.lock:
+            stages = {}
+            for stage in self.STAGES:
+                count = sum(self.histograms[stage])
+                stages[stage] = {
+                    "count": count,
+                    "sum": round(self.sums[stage], 6),
+                    "mean": round(self.sums[stage] / count, 6) if count else None,
+                    "p50": self.quantile(stage, 0.5),
+                    "p95": self.quantile(stage, 0.95),
+                    "p99": self.quantile(stage, 0.99),
+                    "max": round(self.maxima[stage], 6)
+                }
+            return {
+                "started_at": datetime.datetime.fromtimestamp(self.start_time).isoformat(timespec="seconds"),
+                "duration_seconds": round(time.time() - self.start_time, 3),
+                "stages": stages,
+                "bytes_received": self.bytes_received,
+                "retries": self.retries,
+                "status_codes": {str(code): count for code, count in sorted(self.status_codes.items())},
+                "connections": self.connections.totals(),
+                "streamed_downloads": dict(self.streams),
+                "categories": dict(self.categories)
+            }
+
+
+    def prometheus(self):
+        summary = self.summary()
+        prefix = self.PREFIX
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each scraping stage.",
+            f"# TYPE {prefix}_stage_seconds histogram"
+        ]
+        with self.lock:
+            for stage in self.STAGES:
+                cumulative = 0
+                for bound, count in zip(self.BUCKETS, self.histograms[stage]):
+                    cumulative += count
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                cumulative += self.histograms[stage][-1]
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {self.sums[stage]:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {cumulative}')
         
+        lines += [
+            f"# HELP {prefix}_received_bytes_total Response bytes received over the network.",
+            f"# TYPE {prefix}_received_bytes_total counter",
+            f"{prefix}_received_bytes_total {summary['bytes_received']}",
+            f"# HELP {prefix}_retries_total Requests retried after an error or retryable status.",
+            f"# TYPE {prefix}_retries_total counter",
+            f"{prefix}_retries_total {summary['retries']}",
+            f"# HELP {prefix}_responses_total HTTP responses by status code.",
+            f"# TYPE {prefix}_responses_total counter"
+        ]
+        lines += [f'{prefix}_responses_total{{code="{code}"}} {count}' for code, count in summary["status_codes"].items()]
+        lines += [
+            f"# HELP {prefix}_connections_opened_total Connections opened to the server.",
+            f"# TYPE {prefix}_connections_opened_total counter",
+            f"{prefix}_connections_opened_total {summary['connections']['connections']}",
+            f"# HELP {prefix}_tls_handshakes_total TLS handshakes performed.",
+            f"# TYPE {prefix}_tls_handshakes_total counter",
+            f"{prefix}_tls_handshakes_total {summary['connections']['tls_handshakes']}",
+            f"# HELP {prefix}_requests_sent_total Requests sent, including retries.",
+            f"# TYPE {prefix}_requests_sent_total counter",
+            f"{prefix}_requests_sent_total {summary['connections']['requests']}"
+        ]
+        lines += [
+            f"# HELP {prefix}_category_articles Articles written per category.",
+            f"# TYPE {prefix}_category_articles gauge"
+        ]
+        lines += [f'{prefix}_category_articles{{category="{category}"}} {stats["articles"]}'
+                  for category, stats in summary["categories"].items()]
+        lines += [
+            f"# HELP {prefix}_category_articles_per_second Article throughput per category.",
+            f"# TYPE {prefix}_category_articles_per_second gauge"
+        ]
+        lines += [f'{prefix}_category_articles_per_second{{category="{category}"}} {stats["articles_per_sec"]}'
+                  for category, stats in summary["categories"].items()]
+        lines += [
+            f"# HELP {prefix}_run_duration_seconds Duration of the last run.",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {summary['duration_seconds']}",
+            f"# HELP {prefix}_run_timestamp_seconds Start time of the last run.",
+            f"# TYPE {prefix}_run_timestamp_seconds gauge",
+            f"{prefix}_run_timestamp_seconds {int(self.start_time)}"
+        ]
+        return "\n".join(lines) + "\n"
 
-        def _format_action_invocation(self, action):
-            if not action.option_strings:
-                metavar = self._metavar_formatter(action, action.dest)(1)
-                return metavar
+
+    def export(self, json_path, prometheus_path):
+        write_json_atomic(json_path, self.summary())
+        tmp_path = Path(f"{prometheus_path}.tmp")
+        tmp_path.write_text(self.prometheus(), encoding="utf-8")
+        os.replace(tmp_path, prometheus_path)
+
+
+
+
+class MetricsRetry(Retry):
+
+    def __init__(self, *args, metrics=None, time_left=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics
+        self.time_left = time_left
+
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.metrics = self.metrics
+        retry.time_left = self.time_left
+        return retry
+
+
+    def out_of_time(self):
+        return self.time_left is not None and self.time_left() == 0
+
+
+    def capped(self, delay):
+        time_left = self.time_left() if self.time_left is not None else None
+        return delay if time_left is None else min(delay, time_left)
+
+
+    def increment(self, *args, **kwargs):
+        response = kwargs.get("response")
+        status = response.status if response is not None else None
+        try:
+            if self.out_of_time():
+                retry = Retry.increment(self.new(total=0), *args, **kwargs)
             else:
-                parts = []
-                if action.nargs == 0:
-                    parts.extend(action.option_strings)
-                else:
-                    default = action.dest.upper()
-                    args_string = self._format_args(action, default)
-                    for option_string in action.option_strings:
-                        parts.append('%s %s' % (option_string, args_string))
-                return ', '.join(parts)
-        
+                retry = super().increment(*args, **kwargs)
+        except MaxRetryError:
+            if self.metrics is not None and status is not None:
+                self.metrics.record_response(status, 0)
+            raise
+        if self.metrics is not None and not (response is not None and response.get_redirect_location()):
+            self.metrics.record_retry(status)
+        return retry
 
-        def _format_text(self, text):
-            if text.startswith("Available categories:"):
-                return text
-            return super()._format_text(text)
 
+    def sleep(self, response=None):
+        if self.time_left is None or self.time_left() is None:
+            super().sleep(response)
+            return
+        retry_after = self.get_retry_after(response) if response is not None and self.respect_retry_after_header else None
+        time.sleep(self.capped(retry_after or self.get_backoff_time()))
 
-    categories_help = "Available categories:\n"
-    category_desc = {
-        "politics": "Russian Politics & Diplomacy",
-        "world": "World",
-        "economy": "Business & Economy",
-        "defense": "Military & Defense",
-        "science": "Science & Space",
-        "emergencies": "Emergencies",
-        "society": "Society & Culture",
-        "pressreview": "Press Review",
+
+
+
+class DaemonThreadPoolExecutor(Executor):
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.work = SimpleQueue()
+        self.threads = []
+        self.shutting_down = False
+        self.lock = threading.Lock()
+
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        with self.lock:
+            if self.shutting_down:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self.work.put((future, fn, args, kwargs))
+            if len(self.threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        return future
+
+
+    def _work(self):
+        while True:
+            item = self.work.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self.lock:
+            self.shutting_down = True
+            if cancel_futures:
+                while True:
+                    try:
+                        item = self.work.get_nowait()
+                    except Empty:
+                        break
+                    if item is not None:
+                        item[0].cancel()
+            for _ in self.threads:
+                self.work.put(None)
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+
+
+
+class ConcurrencyController:
+
+    MIN_WINDOW = 8
+    ERROR_RATE = 0.05
+    LATENCY_TOLERANCE = 2.0
+    BACKOFF = 0.7
+    LATENCY_BACKOFF = 0.9
+    BASELINE_DRIFT = 1.02
+
+
+    def __init__(self, initial, minimum, maximum, metrics):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = min(max(initial, minimum), maximum)
+        self.metrics = metrics
+        self.samples = []
+        self.baseline = None
+        self.slow_start = True
+        self.saturated = False
+        self.recovering = False
+        self.counters = self._counters()
+        self.peak = self.limit
+        self.decreases = 0
+        self.lock = threading.Lock()
+
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+
+    def _counters(self):
+        with self.metrics.lock:
+            codes = self.metrics.status_codes
+            return codes[429], sum(codes[status] for status in RETRY_STATUSES if status != 429), self.metrics.retries
+
+
+    def update(self):
+        counters = self._counters()
+        throttled, errors, retries = (now - before for now, before in zip(counters, self.counters))
+        failures = max(retries, throttled + errors)
+        with self.lock:
+            events = len(self.samples) + failures
+            if events < max(self.limit, self.MIN_WINDOW):
+                return None
+            samples = sorted(self.samples)
+            self.samples = []
+        self.counters = counters
+        
+        median = samples[len(samples) // 2] if samples else None
+        congested = throttled or failures / events > self.ERROR_RATE
+        slow = median is not None and self.baseline is not None and median > self.baseline * self.LATENCY_TOLERANCE
+        old = self.limit
+        if (congested or slow) and self.recovering:
+            reason = None
+        elif congested:
+            self.limit = max(self.minimum, int(old * self.BACKOFF))
+            reason = f"{throttled} throttled and {failures} failed or retried of {events} requests"
+        elif slow:
+            self.limit = max(self.minimum, int(old * self.LATENCY_BACKOFF))
+            reason = f"median latency {median * 1000:.0f} ms is over {self.LATENCY_TOLERANCE:g}x the {self.baseline * 1000:.0f} ms baseline"
+        elif self.saturated:
+            self.limit = min(self.maximum, old * 2 if self.slow_start else old + 1)
+            reason = f"median latency {median * 1000:.0f} ms, no errors" if median is not None else "no errors"
+        else:
+            reason = None
+        
+        if median is not None:
+            self.baseline = median if self.baseline is None else min(median, self.baseline * self.BASELINE_DRIFT)
+        self.saturated = False
+        # Requests started before a decrease still report the old congestion, so skip one window
+        self.recovering = self.limit < old
+        if congested or slow:
+            self.slow_start = False
+        if self.limit < old:
+            self.decreases += 1
+        self.peak = max(self.peak, self.limit)
+        if self.limit == old:
+            return None
+        return f"Auto workers: {old} -> {self.limit} ({reason})"
+
+
+    def summary(self):
+        return f"Auto workers ended at {self.limit} (peak {self.peak}, {self.decreases} decreases)"
+
+
+
+
+class ArticleIndex:
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "link TEXT PRIMARY KEY, content TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self.connection.commit()
+
+
+    def get(self, link):
+        with self.lock:
+            row = self.connection.execute("SELECT content FROM articles WHERE link = ?", (link,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+    def has(self, link):
+        with self.lock:
+            row = self.connection.execute("SELECT 1 FROM articles WHERE link = ?", (link,)).fetchone()
+        return row is not None
+
+
+    def put(self, link, content):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO articles (link, content, fetched_at) VALUES (?, ?, ?)",
+                (link, json.dumps(content, ensure_ascii=False), time.time())
+            )
+            self.connection.commit()
+
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+
+
+class SearchIndex:
+
+    COMMIT_EVERY = 500
+
+
+    def __init__(self, path):
+        self.path = path
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "id INTEGER PRIMARY KEY, link TEXT NOT NULL UNIQUE, category TEXT NOT NULL, date TEXT NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS documents_date ON documents (date)")
+            self.connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS documents_text USING fts5("
+                "title, description, content, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            self.connection.commit()
+
+
+    def add(self, category, article):
+        content = article.get("content") or ""
+        if isinstance(content, list):
+            content = "\n".join(content)
+        
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO documents (link, category, date) VALUES (?, ?, ?)",
+                (article["link"], category, str(article["date"]))
+            )
+            if cursor.rowcount == 0:
+                return False
+            self.connection.execute(
+                "INSERT INTO documents_text (rowid, title, description, content) VALUES (?, ?, ?, ?)",
+                (cursor.lastrowid, article["title"], article["description"], content)
+            )
+            self.pending += 1
+            if self.pending >= self.COMMIT_EVERY:
+                self.connection.commit()
+                self.pending = 0
+        return True
+
+
+    def search(self, query, since=None, until=None, categories=None, limit=20):
+        sql = ("SELECT documents.date, documents.category, documents_text.title, documents.link, "
+               "snippet(documents_text, 2, '[', ']', '...', 16) "
+               "FROM documents_text JOIN documents ON documents.id = documents_text.rowid "
+               "WHERE documents_text MATCH ?")
+        params = [query]
+        if since:
+            sql += " AND documents.date >= ?"
+            params.append(since)
+        if until:
+            sql += " AND documents.date < ?"
+            params.append(until)
+        if categories:
+            sql += f" AND documents.category IN ({', '.join('?' * len(categories))})"
+            params.extend(categories)
+        sql += " ORDER BY bm25(documents_text) LIMIT ?"
+        params.append(limit)
+        
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+
+    def commit(self):
+        with self.lock:
+            self.connection.commit()
+            self.pending = 0
+
+
+    def close(self):
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+
+
+
+
+class NearDuplicateIndex:
+
+    PERMUTATIONS = 128
+    BANDS = 32
+    BUCKET_SIZE = 8
+    SHINGLE_WORDS = 5
+    MIN_PARAGRAPH_WORDS = 8
+    PRIME = (1 << 32) + 15
+    COMMIT_EVERY = 500
+
+
+    def __init__(self, path, similarity=0.8):
+        self.path = path
+        self.similarity = similarity
+        self.pending = 0
+        self.added = 0
+        self.matched = set()
+        self.reused = {}
+        self.lock = threading.Lock()
+        seeds = numpy.frombuffer(hashlib.shake_128(b"tass-minhash").digest(self.PERMUTATIONS * 8), dtype="<u4")
+        self.a = seeds[:self.PERMUTATIONS].astype(numpy.uint64) | 1
+        self.b = seeds[self.PERMUTATIONS:].astype(numpy.uint64)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "id INTEGER PRIMARY KEY, link TEXT NOT NULL UNIQUE, category TEXT NOT NULL, date TEXT NOT NULL, "
+                "title TEXT NOT NULL, cluster INTEGER NOT NULL, signature BLOB NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS articles_cluster ON articles (cluster)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, article INTEGER NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS buckets_bucket ON buckets (bucket)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS paragraphs (fingerprint INTEGER NOT NULL, article INTEGER NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS paragraphs_fingerprint ON paragraphs (fingerprint)")
+            self.connection.commit()
+
+
+    def signature(self, tokens):
+        if len(tokens) < self.SHINGLE_WORDS:
+            return None
+        hashes = numpy.array([zlib.crc32(token.encode("utf-8")) for token in tokens], dtype=numpy.uint64)
+        count = len(tokens) - self.SHINGLE_WORDS + 1
+        shingles = numpy.zeros(count, dtype=numpy.uint64)
+        for i in range(self.SHINGLE_WORDS):
+            shingles = (shingles * numpy.uint64(0x01000193) + hashes[i:i + count]) & numpy.uint64(0xFFFFFFFF)
+        shingles = numpy.unique(shingles)
+        permuted = (numpy.outer(self.a, shingles) + self.b[:, None]) % numpy.uint64(self.PRIME)
+        return (permuted.min(axis=1) & numpy.uint64(0xFFFFFFFF)).astype(numpy.uint32)
+
+
+    def band_keys(self, signature):
+        bands = signature.reshape(self.BANDS, -1).astype(numpy.uint64)
+        keys = numpy.arange(self.BANDS, dtype=numpy.uint64)
+        for column in bands.T:
+            keys = keys * numpy.uint64(0x100000001B3) + column
+        return keys.view(numpy.int64).tolist()
+
+
+    def add(self, category, article):
+        paragraphs = article.get("content") or []
+        if isinstance(paragraphs, str):
+            paragraphs = paragraphs.split("\n")
+        paragraph_tokens = [tokenize([paragraph]) for paragraph in paragraphs]
+        signature = self.signature([token for tokens in paragraph_tokens for token in tokens])
+        if signature is None:
+            return False
+        
+        fingerprints = {}
+        for paragraph, tokens in zip(paragraphs, paragraph_tokens):
+            if len(tokens) >= self.MIN_PARAGRAPH_WORDS:
+                digest = hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=8).digest()
+                fingerprints.setdefault(int.from_bytes(digest, "little", signed=True), paragraph)
+        keys = self.band_keys(signature)
+        
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO articles (link, category, date, title, cluster, signature) VALUES (?, ?, ?, ?, 0, ?)",
+                (article["link"], category, str(article["date"]), article["title"], signature.tobytes())
+            )
+            if cursor.rowcount == 0:
+                return False
+            article_id = cursor.lastrowid
+            
+            rows = self.connection.execute(
+                f"SELECT buckets.bucket, articles.id, articles.cluster, articles.signature FROM buckets "
+                f"JOIN articles ON articles.id = buckets.article WHERE buckets.bucket IN ({', '.join('?' * len(keys))})",
+                keys
+            ).fetchall()
+            candidates = {article: (cluster, other) for _, article, cluster, other in rows}
+            clusters = set()
+            if candidates:
+                others = numpy.frombuffer(b"".join(other for _, other in candidates.values()), dtype=numpy.uint32)
+                similar = (others.reshape(len(candidates), -1) == signature).mean(axis=1) >= self.similarity
+                clusters = {cluster for (cluster, _), match in zip(candidates.values(), similar) if match}
+            cluster = min(clusters, default=article_id)
+            self.connection.execute("UPDATE articles SET cluster = ? WHERE id = ?", (cluster, article_id))
+            merged = sorted(clusters - {cluster})
+            if merged:
+                self.connection.execute(f"UPDATE articles SET cluster = ? WHERE cluster IN ({', '.join('?' * len(merged))})",
+                                        (cluster, *merged))
+            if clusters:
+                self.matched.add(article_id)
+            members = {}
+            for bucket, other_id, _, _ in rows:
+                members.setdefault(bucket, []).append(other_id)
+            evicted = [(bucket, other_id) for bucket, ids in members.items()
+                       for other_id in sorted(ids)[:max(len(ids) - self.BUCKET_SIZE + 1, 0)]]
+            self.connection.executemany("DELETE FROM buckets WHERE bucket = ? AND article = ?", evicted)
+            self.connection.executemany("INSERT INTO buckets (bucket, article) VALUES (?, ?)",
+                                        [(key, article_id) for key in keys])
+            
+            for fingerprint, paragraph in fingerprints.items():
+                if fingerprint not in self.reused and self.connection.execute(
+                        "SELECT 1 FROM paragraphs WHERE fingerprint = ? LIMIT 1", (fingerprint,)).fetchone():
+                    self.reused[fingerprint] = paragraph
+            self.connection.executemany("INSERT INTO paragraphs (fingerprint, article) VALUES (?, ?)",
+                                        [(fingerprint, article_id) for fingerprint in fingerprints])
+            
+            self.added += 1
+            self.pending += 1
+            if self.pending >= self.COMMIT_EVERY:
+                self.connection.commit()
+                self.pending = 0
+        return True
+
+
+    def report(self):
+        with self.lock:
+            clusters = set()
+            for article_id in self.matched:
+                clusters.add(self.connection.execute("SELECT cluster FROM articles WHERE id = ?", (article_id,)).fetchone()[0])
+            groups = []
+            for cluster in clusters:
+                rows = self.connection.execute(
+                    "SELECT date, category, title, link FROM articles WHERE cluster = ? ORDER BY date, id", (cluster,)
+                ).fetchall()
+                groups.append([{"date": date, "category": category, "title": title, "link": link}
+                               for date, category, title, link in rows])
+            paragraphs = []
+            for fingerprint, text in self.reused.items():
+                links = [link for link, in self.connection.execute(
+                    "SELECT DISTINCT articles.link FROM paragraphs JOIN articles ON articles.id = paragraphs.article "
+                    "WHERE paragraphs.fingerprint = ? ORDER BY articles.date, articles.id", (fingerprint,)
+                )]
+                paragraphs.append({"text": text, "articles": len(links), "links": links})
+        
+        if not groups and not paragraphs:
+            return None
+        groups.sort(key=lambda group: (-len(group), group[0]["date"]))
+        paragraphs.sort(key=lambda paragraph: -paragraph["articles"])
+        return {
+            "similarity": self.similarity,
+            "near_duplicate_articles": groups,
+            "reused_paragraphs": paragraphs
+        }
+
+
+    def summary(self):
+        return f"Found {len(self.matched)} near-duplicates of earlier articles and {len(self.reused)} reused paragraphs"
+
+
+    def close(self):
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+
+
+
+
+class WorkQueue:
+
+    def __init__(self, path, lease_seconds=120):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS categories ("
+                "category TEXT PRIMARY KEY, state TEXT NOT NULL DEFAULT 'pending', "
+                "lease_owner TEXT, lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS listings ("
+                "category TEXT NOT NULL, position INTEGER NOT NULL, key TEXT NOT NULL, article TEXT NOT NULL, "
+                "PRIMARY KEY (category, position))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "key TEXT PRIMARY KEY, link TEXT NOT NULL, state TEXT NOT NULL DEFAULT 'pending', "
+                "lease_owner TEXT, lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, content TEXT)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS articles_state ON articles (state)")
+
+
+    @contextmanager
+    def transaction(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+
+    def join(self, job):
+        with self.transaction() as connection:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'job'").fetchone()
+            if row is not None:
+                return json.loads(row[0])
+            connection.execute("INSERT INTO meta (key, value) VALUES ('job', ?)", (json.dumps(job),))
+            connection.executemany("INSERT INTO categories (category) VALUES (?)",
+                                   [(category,) for category in job["categories"]])
+            return job
+
+
+    def _lease(self, connection, table, column, owner, limit):
+        now = time.time()
+        rows = connection.execute(
+            f"SELECT {column} FROM {table} "
+            f"WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) LIMIT ?",
+            (now, limit)
+        ).fetchall()
+        connection.executemany(
+            f"UPDATE {table} SET state = 'leased', lease_owner = ?, lease_expires = ? WHERE {column} = ?",
+            [(owner, now + self.lease_seconds, row[0]) for row in rows]
+        )
+        return [row[0] for row in rows]
+
+
+    def lease_category(self, owner):
+        with self.transaction() as connection:
+            leased = self._lease(connection, "categories", "category", owner, 1)
+        return leased[0] if leased else None
+
+
+    def lease_articles(self, owner, limit):
+        with self.transaction() as connection:
+            keys = self._lease(connection, "articles", "key", owner, limit)
+            return [(key, connection.execute("SELECT link FROM articles WHERE key = ?", (key,)).fetchone()[0])
+                    for key in keys]
+
+
+    def complete_category(self, owner, category, articles):
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE categories SET state = 'done', lease_owner = NULL, lease_expires = NULL "
+                "WHERE category = ? AND lease_owner = ? AND state = 'leased'",
+                (category, owner)
+            )
+            if cursor.rowcount == 0:
+                return False
+            connection.executemany(
+                "INSERT OR IGNORE INTO listings (category, position, key, article) VALUES (?, ?, ?, ?)",
+                [(category, position, article_key(article["link"]), json.dumps(article, ensure_ascii=False))
+                 for position, article in enumerate(articles)]
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO articles (key, link) VALUES (?, ?)",
+                [(article_key(article["link"]), article["link"]) for article in articles]
+            )
+            return True
+
+
+    def complete_article(self, owner, key, content):
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE articles SET state = 'done', content = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE key = ? AND lease_owner = ? AND state = 'leased'",
+                (json.dumps(content, ensure_ascii=False), key, owner)
+            )
+            return cursor.rowcount == 1
+
+
+    def _fail(self, table, column, value, owner):
+        with self.transaction() as connection:
+            connection.execute(
+                f"UPDATE {table} SET attempts = attempts + 1, state = 'failed', lease_owner = NULL, lease_expires = NULL "
+                f"WHERE {column} = ? AND lease_owner = ? AND state = 'leased'",
+                (value, owner)
+            )
+
+
+    def fail_category(self, owner, category):
+        self._fail("categories", "category", category, owner)
+
+
+    def fail_article(self, owner, key):
+        self._fail("articles", "key", key, owner)
+
+
+    def renew_leases(self, owner):
+        with self.transaction() as connection:
+            for table in ("categories", "articles"):
+                connection.execute(
+                    f"UPDATE {table} SET lease_expires = ? WHERE lease_owner = ? AND state = 'leased'",
+                    (time.time() + self.lease_seconds, owner)
+                )
+
+
+    def finished(self):
+        for table in ("categories", "articles"):
+            row = self.connection.execute(
+                f"SELECT 1 FROM {table} WHERE state IN ('pending', 'leased') LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                return False
+        return True
+
+
+    def claim_export(self, owner):
+        now = time.time()
+        with self.transaction() as connection:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'export'").fetchone()
+            if row is not None:
+                export = json.loads(row[0])
+                if export["done"] or (export["owner"] != owner and export["expires"] >= now):
+                    return False
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('export', ?)",
+                               (json.dumps({"owner": owner, "expires": now + self.lease_seconds, "done": False}),))
+            return True
+
+
+    def finish_export(self, owner):
+        with self.transaction() as connection:
+            export = self._export(connection, owner)
+            if export is not None:
+                export["done"] = True
+                connection.execute("UPDATE meta SET value = ? WHERE key = 'export'", (json.dumps(export),))
+
+
+    def release_export(self, owner):
+        with self.transaction() as connection:
+            if self._export(connection, owner) is not None:
+                connection.execute("DELETE FROM meta WHERE key = 'export'")
+
+
+    def _export(self, connection, owner):
+        row = connection.execute("SELECT value FROM meta WHERE key = 'export'").fetchone()
+        if row is None:
+            return None
+        export = json.loads(row[0])
+        return export if export["owner"] == owner else None
+
+
+    def iter_category(self, category):
+        rows = self.connection.execute(
+            "SELECT listings.article, articles.content FROM listings "
+            "JOIN articles ON articles.key = listings.key "
+            "WHERE listings.category = ? ORDER BY listings.position",
+            (category,)
+        ).fetchall()
+        for article, content in rows:
+            yield json.loads(article), json.loads(content) if content else None
+
+
+    def close(self):
+        self.connection.close()
+
+
+
+
+class BackfillCheckpoint:
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS listings ("
+                "category TEXT PRIMARY KEY, done INTEGER NOT NULL DEFAULT 0, oldest TEXT)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen ("
+                "category TEXT NOT NULL, news_id TEXT NOT NULL, PRIMARY KEY (category, news_id)) WITHOUT ROWID"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS windows ("
+                "category TEXT NOT NULL, window_start TEXT NOT NULL, window_end TEXT NOT NULL, "
+                "state TEXT NOT NULL DEFAULT 'pending', PRIMARY KEY (category, window_start))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "category TEXT NOT NULL, link TEXT NOT NULL, window_start TEXT NOT NULL, position INTEGER NOT NULL, "
+                "article TEXT NOT NULL, state TEXT NOT NULL DEFAULT 'pending', content TEXT, "
+                "PRIMARY KEY (category, link))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS articles_window ON articles (category, window_start, state)")
+
+
+    @contextmanager
+    def transaction(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+
+    def start(self, job, categories, windows):
+        with self.transaction() as connection:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'job'").fetchone()
+            if row is None:
+                connection.execute("INSERT INTO meta (key, value) VALUES ('job', ?)", (json.dumps(job),))
+            elif json.loads(row[0]) != job:
+                stored = json.loads(row[0])
+                raise ValueError(f"{self.path} belongs to the backfill from {stored['since']} to {stored['until']} "
+                                 f"in {stored['window_days']} day windows, use another output directory")
+            connection.executemany("INSERT OR IGNORE INTO listings (category) VALUES (?)",
+                                   [(category,) for category in categories])
+            connection.executemany("INSERT OR IGNORE INTO windows (category, window_start, window_end) VALUES (?, ?, ?)",
+                                   [(category, start, end) for category in categories for start, end in windows])
+            connection.execute("UPDATE articles SET state = 'pending' WHERE state = 'failed'")
+
+
+    def listing(self, category):
+        done, oldest = self.connection.execute(
+            "SELECT done, oldest FROM listings WHERE category = ?", (category,)
+        ).fetchone()
+        seen = [row[0] for row in self.connection.execute("SELECT news_id FROM seen WHERE category = ?", (category,))]
+        return bool(done), oldest, seen
+
+
+    def windows(self, category):
+        return self.connection.execute(
+            "SELECT window_start, window_end, state FROM windows WHERE category = ? ORDER BY window_start DESC", (category,)
+        ).fetchall()
+
+
+    def pending_articles(self, category):
+        rows = self.connection.execute(
+            "SELECT window_start, article FROM articles WHERE category = ? AND state = 'pending' ORDER BY position",
+            (category,)
+        ).fetchall()
+        return [(window, json.loads(article)) for window, article in rows]
+
+
+    def add_page(self, category, news_ids, articles, oldest, done):
+        with self.transaction() as connection:
+            position = connection.execute("SELECT COUNT(*) FROM seen WHERE category = ?", (category,)).fetchone()[0]
+            connection.executemany("INSERT OR IGNORE INTO seen (category, news_id) VALUES (?, ?)",
+                                   [(category, news_id) for news_id in news_ids])
+            connection.executemany(
+                "INSERT OR IGNORE INTO articles (category, link, window_start, position, article) VALUES (?, ?, ?, ?, ?)",
+                [(category, article["link"], window, position + i, json.dumps(article, ensure_ascii=False))
+                 for i, (window, article) in enumerate(articles)]
+            )
+            connection.execute("UPDATE listings SET done = ?, oldest = ? WHERE category = ?", (int(done), oldest, category))
+
+
+    def complete_article(self, category, link, content):
+        with self.transaction() as connection:
+            connection.execute(
+                "UPDATE articles SET state = 'done', content = ? WHERE category = ? AND link = ?",
+                (json.dumps(content, ensure_ascii=False), category, link)
+            )
+
+
+    def fail_article(self, category, link):
+        with self.transaction() as connection:
+            connection.execute("UPDATE articles SET state = 'failed' WHERE category = ? AND link = ?", (category, link))
+
+
+    def iter_window(self, category, window):
+        rows = self.connection.execute(
+            "SELECT article, content FROM articles WHERE category = ? AND window_start = ? AND state = 'done' "
+            "ORDER BY position",
+            (category, window)
+        ).fetchall()
+        for article, content in rows:
+            yield json.loads(article), json.loads(content)
+
+
+    def failed_articles(self, category, window):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM articles WHERE category = ? AND window_start = ? AND state = 'failed'",
+            (category, window)
+        ).fetchone()[0]
+
+
+    def finish_window(self, category, window, state):
+        with self.transaction() as connection:
+            connection.execute("UPDATE windows SET state = ? WHERE category = ? AND window_start = ?",
+                               (state, category, window))
+
+
+    def close(self):
+        self.connection.close()
+
+
+
+
+class ResponseCache:
+
+    CACHED_HEADERS = ("content-type", "etag", "last-modified")
+    HIT_BATCH = 100
+
+
+    def __init__(self, path, ttl, max_bytes):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.accessed = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, headers TEXT NOT NULL, body BLOB NOT NULL, "
+                "size INTEGER NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self.connection.commit()
+            self.total_size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+    def lookup(self, url):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT headers, body, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        
+        headers, body, stored_at = row
+        return CaseInsensitiveDict(json.loads(headers)), zlib.decompress(body), time.time() - stored_at < self.ttl
+
+
+    def is_fresh(self, url):
+        with self.lock:
+            row = self.connection.execute("SELECT stored_at FROM responses WHERE url = ?", (url,)).fetchone()
+        return row is not None and time.time() - row[0] < self.ttl
+
+
+    def conditional_headers(self, cached_headers):
+        headers = {}
+        if "etag" in cached_headers:
+            headers["If-None-Match"] = cached_headers["etag"]
+        if "last-modified" in cached_headers:
+            headers["If-Modified-Since"] = cached_headers["last-modified"]
+        return headers
+
+
+    def record_hit(self, url):
+        with self.lock:
+            self.hits += 1
+            self.accessed[url] = time.time()
+            if len(self.accessed) >= self.HIT_BATCH:
+                self._save_accessed()
+                self.connection.commit()
+
+
+    def record_revalidation(self, url):
+        with self.lock:
+            self.hits += 1
+            self.revalidated += 1
+            self.accessed.pop(url, None)
+            now = time.time()
+            self.connection.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self.connection.commit()
+
+
+    def store(self, url, headers, body):
+        cached_headers = {name: headers[name] for name in self.CACHED_HEADERS if name in headers}
+        compressed = zlib.compress(body)
+        now = time.time()
+        
+        with self.lock:
+            self.misses += 1
+            previous = self.connection.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (url, headers, body, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(cached_headers), compressed, len(compressed), now, now)
+            )
+            self.total_size += len(compressed) - (previous[0] if previous else 0)
+            if self.total_size > self.max_bytes:
+                self._save_accessed()
+                self._evict()
+            self.connection.commit()
+
+
+    def record_miss(self):
+        with self.lock:
+            self.misses += 1
+
+
+    def _save_accessed(self):
+        self.connection.executemany("UPDATE responses SET accessed_at = ? WHERE url = ?",
+                                    [(accessed_at, url) for url, accessed_at in self.accessed.items()])
+        self.accessed.clear()
+
+
+    def _evict(self):
+        while self.total_size > self.max_bytes:
+            rows = self.connection.execute(
+                "SELECT url, size FROM responses ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                self.connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self.total_size -= size
+                if self.total_size <= self.max_bytes:
+                    break
+
+
+    def summary(self):
+        return f"HTTP cache: {self.hits} hits ({self.revalidated} revalidated), {self.misses} misses"
+
+
+    def close(self):
+        with self.lock:
+            self._save_accessed()
+            self.connection.commit()
+            self.connection.close()
+
+
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+
+    def __init__(self, *args, connection_stats=None, **kwargs):
+        self.connection_stats = connection_stats
+        super().__init__(*args, **kwargs)
+
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        if self.connection_stats is not None:
+            self.poolmanager.pool_classes_by_scheme = self.connection_stats.pool_classes()
+
+
+
+
+class CachingHTTPAdapter(CountingHTTPAdapter):
+
+    def __init__(self, cache, *args, **kwargs):
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+        
+        cached = self.cache.lookup(request.url)
+        if cached is not None:
+            cached_headers, body, fresh = cached
+            if fresh:
+                self.cache.record_hit(request.url)
+                return self._cached_response(request, cached_headers, body)
+            request.headers.update(self.cache.conditional_headers(cached_headers))
+        
+        response = super().send(request, **kwargs)
+        if cached is not None and response.status_code == 304:
+            self.cache.record_revalidation(request.url)
+            return self._cached_response(request, cached_headers, body)
+        
+        if response.status_code == 200 and not kwargs.get("stream"):
+            self.cache.store(request.url, response.headers, response.content)
+        else:
+            self.cache.record_miss()
+        return response
+
+
+    def _cached_response(self, request, headers, body):
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response._content = body
+        response._content_consumed = True
+        return response
+
+
+
+
+class Http2Adapter(CountingHTTPAdapter):
+
+    def __init__(self, client, *args, **kwargs):
+        self.client = client
+        super().__init__(*args, **kwargs)
+
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        headers = {name: value for name, value in request.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS}
+        metrics = getattr(self.max_retries, "metrics", None)
+        retries = 0
+        while True:
+            http_request = self.client.build_request(request.method, request.url,
+                                                     headers=headers,
+                                                     content=request.body,
+                                                     timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                                                     extensions={"trace": self._trace(metrics, request.url.startswith("https:"))})
+            try:
+                response = self.client.send(http_request, stream=True)
+            except httpx.TransportError as e:
+                if retries >= self.max_retries.total or self.max_retries.out_of_time():
+                    if isinstance(e, httpx.TimeoutException):
+                        raise requests.exceptions.Timeout(e, request=request)
+                    raise requests.exceptions.ConnectionError(e, request=request)
+                retry_after = None
+                status = None
+            else:
+                if (response.status_code not in RETRY_STATUSES or retries >= self.max_retries.total
+                        or self.max_retries.out_of_time()):
+                    return self._http2_response(request, response)
+                retry_after = response.headers.get("Retry-After")
+                status = response.status_code
+                response.close()
+            
+            if metrics is not None:
+                metrics.record_retry(status)
+            retries += 1
+            time.sleep(self.max_retries.capped(retry_delay(retries, retry_after)))
+
+
+    def _trace(self, metrics, tls):
+        def trace(event, info):
+            if metrics is None:
+                return
+            if event.endswith("send_request_headers.started"):
+                metrics.connections.record_request()
+            elif event == "connection.connect_tcp.complete":
+                metrics.connections.record_connection(tls)
+        return trace
+
+
+    def _http2_response(self, request, http_response):
+        response = requests.Response()
+        response.status_code = http_response.status_code
+        response.reason = http_response.reason_phrase
+        response.headers = CaseInsensitiveDict({name: value for name, value in http_response.headers.items()
+                                                if name.lower() != "content-encoding"})
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = Http2ResponseBody(http_response)
+        return response
+
+
+    def close(self):
+        super().close()
+        self.client.close()
+
+
+
+
+class Http2ResponseBody:
+
+    def __init__(self, response):
+        self.response = response
+        self.chunks = None
+
+
+    def stream(self, chunk_size, decode_content=True):
+        if self.chunks is None:
+            self.chunks = self.response.iter_bytes(chunk_size)
+        try:
+            for chunk in self.chunks:
+                yield chunk
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e)
+
+
+    def tell(self):
+        return self.response.num_bytes_downloaded
+
+
+    def close(self):
+        self.response.close()
+
+
+
+
+class CachingHttp2Adapter(CachingHTTPAdapter, Http2Adapter):
+    pass
+
+
+
+
+class ArticleWriter:
+
+    FLUSH_EVERY = 50
+    NEWLINE = None
+
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.temp_path = self.path.with_name(self.path.name + ".tmp")
+        self.file = open(self.temp_path, "w", newline=self.NEWLINE, encoding="utf-8")
+        self.count = 0
+
+
+    def write(self, article):
+        self._write_article(article)
+        self.count += 1
+        if self.count % self.FLUSH_EVERY == 0:
+            self.file.flush()
+
+
+    def close(self):
+        self._write_footer()
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+
+    def abort(self):
+        self.file.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+    def _write_article(self, article):
+        raise NotImplementedError
+
+
+    def _write_footer(self):
+        pass
+
+
+
+
+class JsonArticleWriter(ArticleWriter):
+
+    def _write_article(self, article):
+        item = json.dumps(article, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+        self.file.write(("[\n    " if self.count == 0 else ",\n    ") + item)
+
+
+    def _write_footer(self):
+        self.file.write("\n]" if self.count else "[]")
+
+
+
+
+class JsonLinesArticleWriter(ArticleWriter):
+
+    def _write_article(self, article):
+        self.file.write(json.dumps(article, ensure_ascii=False) + "\n")
+
+
+
+
+class CsvArticleWriter(ArticleWriter):
+
+    NEWLINE = ""
+
+
+    def __init__(self, path, fieldnames):
+        super().__init__(path)
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, restval="")
+        self.writer.writeheader()
+
+
+    def _write_article(self, article):
+        self.writer.writerow(article)
+
+
+    def close(self):
+        if self.count == 0:
+            self.abort()
+        else:
+            super().close()
+
+
+
+
+class ParquetArticleWriter:
+
+    ROW_GROUP_SIZE = 500
+
+
+    def __init__(self, root, category, include_top_words):
+        self.root = Path(root) / f"category={category}"
+        self.file_name = f"part-{uuid.uuid4().hex}.parquet"
+        self.include_top_words = include_top_words
+        fields = [
+            ("title", pyarrow.string()),
+            ("description", pyarrow.string()),
+            ("date", pyarrow.timestamp("s")),
+            ("link", pyarrow.string()),
+            ("content", pyarrow.list_(pyarrow.string()))
+        ]
+        if include_top_words:
+            fields.append(("top_words", pyarrow.list_(pyarrow.struct([("word", pyarrow.string()),
+                                                                      ("count", pyarrow.int32())]))))
+        self.schema = pyarrow.schema(fields)
+        self.buffers = {}
+        self.writers = {}
+        self.count = 0
+
+
+    def write(self, article):
+        day = article["date"][:10]
+        rows = self.buffers.setdefault(day, [])
+        rows.append({
+            "title": article["title"],
+            "description": article["description"],
+            "date": datetime.datetime.fromisoformat(article["date"]),
+            "link": article["link"],
+            "content": article.get("content"),
+            "top_words": article.get("top_words")
+        })
+        self.count += 1
+        if len(rows) >= self.ROW_GROUP_SIZE:
+            self._flush(day)
+
+
+    def close(self):
+        for day in list(self.buffers):
+            self._flush(day)
+        for day, writer in self.writers.items():
+            writer.close()
+            os.replace(self._temp_path(day), self.root / f"day={day}" / self.file_name)
+
+
+    def abort(self):
+        for day, writer in self.writers.items():
+            writer.close()
+            self._temp_path(day).unlink(missing_ok=True)
+
+
+    def _flush(self, day):
+        rows = self.buffers.pop(day)
+        writer = self.writers.get(day)
+        if writer is None:
+            self._temp_path(day).parent.mkdir(parents=True, exist_ok=True)
+            writer = pyarrow.parquet.ParquetWriter(self._temp_path(day), self.schema, compression="zstd")
+            self.writers[day] = writer
+        writer.write_table(pyarrow.Table.from_pylist(rows, schema=self.schema))
+
+
+    def _temp_path(self, day):
+        return self.root / f"day={day}" / f".{self.file_name}.tmp"
+
+
+
+
+class ArchiveWriter:
+
+    FRAME_ARTICLES = 32
+
+
+    def __init__(self, root, shard_bytes, compression=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.shard_bytes = shard_bytes
+        self.compression = compression or ("zstd" if zstandard else "gzip")
+        self.manifest_path = self.root / "manifest.json"
+        self.known = set()
+        if self.manifest_path.exists():
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            reader = ArchiveReader(self.root)
+            self.known = reader.hashes()
+            reader.close()
+        else:
+            self.manifest = {"shards": []}
+        self.frame = []
+        self.records = []
+        self.file = None
+        self.shard_name = None
+        self.count = 0
+
+
+    def append(self, category, article):
+        key = link_hash(article["link"])
+        if key in self.known:
+            return False
+        
+        self.known.add(key)
+        self.frame.append({**article, "category": category})
+        self.count += 1
+        if len(self.frame) >= self.FRAME_ARTICLES:
+            self._flush_frame()
+        return True
+
+
+    def close(self):
+        self._flush_frame()
+        if self.file is not None:
+            self._finish_shard()
+
+
+    def _flush_frame(self):
+        if not self.frame:
+            return
+        if self.file is None:
+            self._open_shard()
+        
+        data = compress_frame("".join(json.dumps(article, ensure_ascii=False) + "\n" for article in self.frame).encode("utf-8"),
+                              self.compression)
+        offset = self.file.tell()
+        self.file.write(data)
+        for position, article in enumerate(self.frame):
+            self.records.append((link_hash(article["link"]), archive_timestamp(article["date"]), offset, len(data), position))
+        self.frame = []
+        
+        if self.file.tell() >= self.shard_bytes:
+            self._finish_shard()
+
+
+    def _open_shard(self):
+        number = len(self.manifest["shards"]) + 1
+        extension = "zst" if self.compression == "zstd" else "gz"
+        self.shard_name = f"shard-{number:05d}.jsonl.{extension}"
+        self.file = open(self.root / f"{self.shard_name}.tmp", "wb")
+
+
+    def _finish_shard(self):
+        self.file.close()
+        self.file = None
+        index_name = self.shard_name.split(".", 1)[0] + ".idx"
+        by_hash = sorted(self.records)
+        by_date = sorted(self.records, key=lambda record: (record[1], record[2], record[4]))
+        
+        temp_path = self.root / f"{index_name}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(ArchiveShard.HEADER.pack(ArchiveShard.MAGIC, len(self.records)))
+            for record in itertools.chain(by_hash, by_date):
+                f.write(ArchiveShard.RECORD.pack(*record))
+        os.replace(temp_path, self.root / index_name)
+        os.replace(self.root / f"{self.shard_name}.tmp", self.root / self.shard_name)
+        
+        self.manifest["shards"].append({
+            "name": self.shard_name,
+            "index": index_name,
+            "compression": self.compression,
+            "articles": len(self.records),
+            "first_date": by_date[0][1],
+            "last_date": by_date[-1][1]
+        })
+        write_json_atomic(self.manifest_path, self.manifest)
+        self.records = []
+
+
+
+
+class ArchiveCategoryWriter:
+
+    def __init__(self, archive, category):
+        self.archive = archive
+        self.category = category
+        self.count = 0
+
+
+    def write(self, article):
+        if self.archive.append(self.category, article):
+            self.count += 1
+
+
+    def close(self):
+        pass
+
+
+    def abort(self):
+        pass
+
+
+
+
+class ArchiveShard:
+
+    MAGIC = b"TASSIDX1"
+    HEADER = struct.Struct("<8sQ")
+    RECORD = struct.Struct("<QqQII")
+
+
+    def __init__(self, root, entry):
+        self.compression = entry["compression"]
+        self.first_date = entry["first_date"]
+        self.last_date = entry["last_date"]
+        with open(Path(root) / entry["index"], "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = self.HEADER.unpack_from(self.index, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"{entry['index']} is not an archive index")
+        self.data = open(Path(root) / entry["name"], "rb")
+
+
+    def record(self, section, i):
+        return self.RECORD.unpack_from(self.index, self.HEADER.size + (section * self.count + i) * self.RECORD.size)
+
+
+    def bisect(self, section, field, value):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.record(section, middle)[field] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+    def read_frame(self, offset, length):
+        self.data.seek(offset)
+        return decompress_frame(self.data.read(length), self.compression).split(b"\n")
+
+
+    def get(self, link):
+        key = link_hash(link)
+        i = self.bisect(0, 0, key)
+        while i < self.count:
+            _, _, offset, length, position = record = self.record(0, i)
+            if record[0] != key:
+                break
+            article = json.loads(self.read_frame(offset, length)[position])
+            if article["link"] == link:
+                return article
+            i += 1
+        return None
+
+
+    def range(self, since, until):
+        i = self.bisect(1, 1, since)
+        frames = {}
+        while i < self.count:
+            _, date, offset, length, position = self.record(1, i)
+            if date >= until:
+                break
+            if offset not in frames:
+                frames[offset] = self.read_frame(offset, length)
+            yield json.loads(frames[offset][position])
+            i += 1
+
+
+    def hashes(self):
+        size = self.count * self.RECORD.size
+        return {record[0] for record in self.RECORD.iter_unpack(self.index[self.HEADER.size:self.HEADER.size + size])}
+
+
+    def close(self):
+        self.index.close()
+        self.data.close()
+
+
+
+
+class ArchiveReader:
+
+    def __init__(self, root):
+        self.root = Path(root)
+        with open(self.root / "manifest.json", encoding="utf-8") as f:
+            self.shards = [ArchiveShard(self.root, entry) for entry in json.load(f)["shards"]]
+
+
+    def get(self, link):
+        for shard in self.shards:
+            article = shard.get(link)
+            if article is not None:
+                return article
+        return None
+
+
+    def range(self, since, until):
+        shards = [shard for shard in self.shards if shard.first_date < until and shard.last_date >= since]
+        return heapq.merge(*(shard.range(since, until) for shard in shards),
+                           key=lambda article: archive_timestamp(article["date"]))
+
+
+    def hashes(self):
+        hashes = set()
+        for shard in self.shards:
+            hashes.update(shard.hashes())
+        return hashes
+
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+
+
+
+class RollingJsonLinesWriter:
+
+    def __init__(self, output_dir, category):
+        self.output_dir = Path(output_dir)
+        self.category = category
+        self.day = None
+        self.file = None
+        self.count = 0
+
+
+    def write(self, article):
+        day = datetime.date.today().isoformat()
+        if day != self.day:
+            self.close()
+            self.day = day
+            self.file = open(self.output_dir / f"{self.category}_{day}.jsonl", "a", encoding="utf-8")
+        self.file.write(json.dumps(article, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.count += 1
+
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+    def abort(self):
+        self.close()
+
+
+
+
+class NewsListPager:
+
+    def __init__(self, total, page_size, seen=()):
+        self.remaining = total
+        self.page_size = page_size
+        self.seen = set(seen)
+        self.exclude_ids = ",".join(seen)
+        self.done = total <= 0
+
+
+    def next_request(self):
+        return min(self.page_size, self.remaining), self.exclude_ids
+
+
+    def add_page(self, news_list, limit):
+        fresh = []
+        fresh_ids = []
+        for article in news_list:
+            if len(fresh) >= self.remaining:
+                break
+            news_id = news_id_from_link(article["link"])
+            if news_id not in self.seen:
+                self.seen.add(news_id)
+                fresh.append(article)
+                fresh_ids.append(news_id)
+        
+        self.remaining -= len(fresh)
+        if fresh_ids:
+            self.exclude_ids += ("," if self.exclude_ids else "") + ",".join(fresh_ids)
+        self.done = not fresh or len(news_list) < limit or self.remaining <= 0
+        return fresh
+
+
+
+
+class CategoryJob:
+
+    def __init__(self, category, pager):
+        self.category = category
+        self.pager = pager
+        self.queue = deque()
+        self.found = 0
+        self.keys = {}
+        self.cached = set()
+        self.buffered = {}
+        self.next_index = 0
+        self.writer = None
+        self.pending = 0
+        self.listed = False
+        self.start_time = time.time()
+
+
+    def drained(self):
+        return self.listed and self.pending == 0 and not self.queue
+
+
+
+
+class RunScheduler:
+
+    RECENT_RESULTS = 256
+
+
+    def __init__(self, scraper, categories, watcher=None):
+        self.scraper = scraper
+        self.logger = scraper.logger
+        self.watcher = watcher
+        self.ordered = scraper.output_format not in ("jsonl", "parquet", "archive") and watcher is None
+        self.jobs = {
+            category: CategoryJob(category, NewsListPager(scraper.config.headlines_per_category,
+                                                          watcher.page_size(category) if watcher else scraper.config.page_size))
+            for category in categories
+        }
+        if watcher is not None:
+            for job in self.jobs.values():
+                job.writer = watcher.writers[job.category]
+        self.unlisted = deque(self.jobs)
+        self.rotation = deque()
+        self.progress_bar = None
+        self.completed = 0
+        self.waiting = {}
+        self.results = OrderedDict()
+        self.listings = {}
+        self.shared_downloads = 0
+        self.content_hashes = {}
+        self.content_duplicates = []
+
+
+    def add_news_page(self, category, news_list, limit):
+        job = self.jobs[category]
+        if job.writer is None:
+            try:
+                job.writer = self.scraper.open_writer(category)
+            except Exception as e:
+                self.fail_category(category, e)
+                return
+        
+        fresh = job.pager.add_page(news_list, limit)
+        if self.watcher is not None:
+            fresh = self.watcher.new_articles(job, fresh)
+        if job.pager.done:
+            job.listed = True
+        else:
+            self.unlisted.append(category)
+        
+        first = job.found
+        job.found += len(fresh)
+        cached = []
+        shared = []
+        index = self.scraper.article_index
+        for i, article in enumerate(fresh, first):
+            if index and index.has(article["link"]):
+                cached.append((i, article))
+                continue
+            
+            key = article_key(article["link"])
+            self.listings.setdefault(key, []).append(category)
+            if key in self.results:
+                shared.append((i, article, key))
+                continue
+            
+            job.keys[i] = key
+            if key in self.waiting:
+                self.waiting[key].append((job, i, article))
+            else:
+                self.waiting[key] = []
+                job.queue.append((i, article))
+        job.cached.update(i for i, _ in cached)
+        
+        if index and job.listed and self.watcher is None:
+            self._interrupt_progress()
+            self.logger.info(f"Found {len(job.cached)} of {job.found} {category} articles in the article index")
+        
+        queued = len(fresh) - len(cached)
+        job.pending += queued
+        if job.queue and job not in self.rotation:
+            self.rotation.append(job)
+        if queued:
+            if self.progress_bar is None:
+                self.progress_bar = ProgressBar(queued)
+            else:
+                self.progress_bar.total += queued
+        
+        for i, article in cached:
+            self._deliver(job, i, article)
+        for i, article, key in shared:
+            self._share(job, i, article, self.results[key])
+        self._finish_if_drained(job)
+
+
+    def fail_category(self, category, error):
+        job = self.jobs[category]
+        job.listed = True
+        self._category_error(category, error)
+        if job.writer is not None:
+            self._finish_if_drained(job)
+
+
+    def _category_error(self, category, error):
+        self._interrupt_progress()
+        self.logger.error(f"Error processing category {category}: {error}")
+        self.scraper.errors_occurred = True
+
+
+    def abandon(self, in_flight):
+        self.unlisted.clear()
+        self.rotation.clear()
+        for job in self.jobs.values():
+            job.listed = True
+            for index, _ in job.queue:
+                self._deliver(job, index, None)
+            job.pending -= len(job.queue)
+            job.queue.clear()
+        
+        for category, index in in_flight:
+            if index is not None:
+                job = self.jobs[category]
+                self._deliver(job, index, None)
+                job.pending -= 1
+        
+        for waiting in self.waiting.values():
+            for job, index, _ in waiting:
+                self._deliver(job, index, None)
+                job.pending -= 1
+        self.waiting.clear()
+        
+        for job in self.jobs.values():
+            if job.writer is not None:
+                self._finish_if_drained(job)
+
+
+    def has_queued(self):
+        return bool(self.unlisted or self.rotation)
+
+
+    def next_task(self):
+        if self.unlisted:
+            category = self.unlisted.popleft()
+            return category, None, self.jobs[category].pager.next_request()
+        
+        job = self.rotation.popleft()
+        index, article = job.queue.popleft()
+        if job.queue:
+            self.rotation.append(job)
+        return job.category, index, article
+
+
+    def article_done(self, category, index, article):
+        job = self.jobs[category]
+        if self.scraper.article_index:
+            self.scraper.article_index.put(article["link"], article["content"])
+        key = job.keys.pop(index)
+        self.results[key] = article
+        if len(self.results) > self.RECENT_RESULTS:
+            self.results.popitem(last=False)
+        self._check_content(article)
+        self._deliver(job, index, article)
+        self._article_finished(job)
+        
+        for waiting_job, waiting_index, waiting_article in self.waiting.pop(key, ()):
+            waiting_job.keys.pop(waiting_index)
+            self._share(waiting_job, waiting_index, waiting_article, article)
+
+
+    def article_failed(self, category, index, error):
+        self._interrupt_progress()
+        self.logger.error(f"Error processing article: {error}")
+        self.scraper.errors_occurred = True
+        job = self.jobs[category]
+        self._deliver(job, index, None)
+        self._article_finished(job)
+        
+        for waiting_job, waiting_index, _ in self.waiting.pop(job.keys.pop(index), ()):
+            waiting_job.keys.pop(waiting_index)
+            self._deliver(waiting_job, waiting_index, None)
+            self._article_finished(waiting_job)
+
+
+    def _share(self, job, index, article, downloaded):
+        article = self.scraper.apply_content(article, downloaded["content"], downloaded.get("top_words"))
+        if self.scraper.article_index:
+            self.scraper.article_index.put(article["link"], article["content"])
+        self.shared_downloads += 1
+        self.scraper.shared_downloads += 1
+        self._deliver(job, index, article)
+        self._article_finished(job)
+
+
+    def _check_content(self, article):
+        digest = hashlib.sha1("\n".join(article["content"]).encode("utf-8")).hexdigest()
+        first_link = self.content_hashes.setdefault(digest, article["link"])
+        if first_link != article["link"]:
+            self.content_duplicates.append([first_link, article["link"]])
+
+
+    def duplicate_report(self):
+        listed = [{"article": key, "categories": categories}
+                  for key, categories in self.listings.items() if len(categories) > 1]
+        if not listed and not self.content_duplicates:
+            return None
+        return {
+            "downloads_saved": self.shared_downloads,
+            "listed_in_several_categories": listed,
+            "same_content_different_links": self.content_duplicates
+        }
+
+
+    def _deliver(self, job, index, article):
+        if not self.ordered:
+            self._write(job, index, article)
+            return
+        
+        job.buffered[index] = article
+        while job.next_index in job.buffered:
+            self._write(job, job.next_index, job.buffered.pop(job.next_index))
+            job.next_index += 1
+
+
+    def _write(self, job, index, article):
+        if article is None:
+            return
+        if index in job.cached:
+            content = self.scraper.article_index.get(article["link"])
+            article = self.scraper.apply_content(article, content)
+        if self.scraper.term_report:
+            self.scraper.term_report.add(job.category, article)
+        if self.scraper.search_index:
+            self.scraper.search_index.add(job.category, article)
+        if self.scraper.near_duplicate_index:
+            self.scraper.near_duplicate_index.add(job.category, article)
+        start = time.perf_counter()
+        job.writer.write(self.scraper.format_article(article))
+        self.scraper.metrics.observe("write", time.perf_counter() - start)
+
+
+    def _article_finished(self, job):
+        job.pending -= 1
+        self.completed += 1
+        self.progress_bar.update(self.completed)
+        self._finish_if_drained(job)
+
+
+    def _finish_if_drained(self, job):
+        if not job.drained() or self.watcher is not None:
+            return
+        
+        writer, job.writer = job.writer, None
+        written = writer.count
+        try:
+            writer.close()
+        except Exception as e:
+            writer.abort()
+            self._category_error(job.category, e)
+            return
+        try:
+            if self.scraper.term_report:
+                self.scraper.term_report.finish_category(job.category, self.scraper.term_report_path(job.category))
+        except Exception as e:
+            self._category_error(job.category, e)
+            return
+        
+        elapsed = max(time.time() - job.start_time, 1e-6)
+        self.scraper.metrics.record_category(job.category, written, elapsed)
+        self._interrupt_progress()
+        self.logger.info(f"Successfully processed {written} articles for {job.category} "
+                         f"({written / elapsed:.1f} articles/sec)")
+
+
+    def _interrupt_progress(self):
+        if self.progress_bar is not None:
+            self.progress_bar.interrupt()
+
+
+
+
+class CategoryWatcher:
+
+    POLL_PAGE_SIZE = 20
+
+
+    def __init__(self, scraper, categories):
+        self.scraper = scraper
+        self.config = scraper.config
+        self.logger = scraper.logger
+        self.categories = categories
+        self.intervals = dict.fromkeys(categories, self.config.watch_interval)
+        self.next_poll = dict.fromkeys(categories, time.monotonic())
+        self.polled = set()
+        self.writers = {category: RollingJsonLinesWriter(scraper.output_dir, category) for category in categories}
+        self.found = Counter()
+        self.cycle_categories = []
+
+
+    def sleep_time(self):
+        return max(min(self.next_poll.values()) - time.monotonic(), 0)
+
+
+    def start_cycle(self):
+        now = time.monotonic()
+        self.cycle_categories = [category for category in self.categories if self.next_poll[category] <= now]
+        self.found.clear()
+        return RunScheduler(self.scraper, self.cycle_categories, watcher=self)
+
+
+    def page_size(self, category):
+        if category in self.polled:
+            return min(self.config.page_size, self.POLL_PAGE_SIZE)
+        return self.config.page_size
+
+
+    def new_articles(self, job, fresh):
+        index = self.scraper.article_index
+        new = [article for article in fresh if not index.has(article["link"])]
+        if len(new) < len(fresh):
+            job.pager.done = True
+        self.found[job.category] += len(new)
+        return new
+
+
+    def finish_cycle(self):
+        for category in self.cycle_categories:
+            self.polled.add(category)
+            if self.found[category]:
+                interval = max(self.intervals[category] / 2, self.config.watch_interval)
+            else:
+                interval = min(self.intervals[category] * 1.5, self.config.watch_max_interval)
+            self.intervals[category] = interval
+            self.next_poll[category] = time.monotonic() + interval
+        
+        self.scraper.export_metrics()
+        if self.scraper.search_index:
+            self.scraper.search_index.commit()
+        found = ", ".join(f"{category}: {self.found[category]}" for category in self.cycle_categories)
+        self.logger.info(f"Found {sum(self.found.values())} new articles ({found}), "
+                         f"next check in {self.sleep_time():.0f}s")
+
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+
+
+class QueueWorker:
+
+    POLL_INTERVAL = 1
+
+
+    def __init__(self, scraper, queue):
+        self.scraper = scraper
+        self.queue = queue
+        self.config = scraper.config
+        self.logger = scraper.logger
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.processed = 0
+
+
+    def run(self, categories):
+        job = self.queue.join({
+            "categories": categories,
+            "headlines": self.config.headlines_per_category,
+            "top_words": self.config.include_top_words
+        })
+        self.config.headlines_per_category = job["headlines"]
+        self.config.include_top_words = job["top_words"]
+        self.logger.info(f"Joined work queue {self.queue.path} as {self.owner}: "
+                         f"{', '.join(job['categories'])} ({job['headlines']} headlines each)")
+        
+        renew_at = time.monotonic() + self.queue.lease_seconds / 3
+        with ThreadPoolExecutor(max_workers=self.scraper.pool_size()) as executor:
+            futures = {}
+            while True:
+                if futures and time.monotonic() >= renew_at:
+                    self.queue.renew_leases(self.owner)
+                    renew_at = time.monotonic() + self.queue.lease_seconds / 3
+                
+                free = max(self.scraper.worker_limit() - len(futures), 0)
+                if free:
+                    category = self.queue.lease_category(self.owner)
+                    if category is not None:
+                        futures[executor.submit(self.scraper.get_news_list, category)] = (category, None)
+                        free -= 1
+                if free:
+                    for key, link in self.queue.lease_articles(self.owner, free):
+                        futures[executor.submit(self.scraper.fetch_article_content, {"link": link})] = (None, key)
+                
+                if not futures:
+                    if self.queue.finished():
+                        break
+                    time.sleep(self.POLL_INTERVAL)
+                    continue
+                
+                done, _ = wait(futures, timeout=self.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    category, key = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        if category is not None:
+                            self.queue.fail_category(self.owner, category)
+                        else:
+                            self.queue.fail_article(self.owner, key)
+                        continue
+                    
+                    if category is not None:
+                        if self.queue.complete_category(self.owner, category, result):
+                            self.logger.info(f"Queued {len(result)} {category} articles")
+                    elif self.queue.complete_article(self.owner, key, {"content": result["content"],
+                                                                       "top_words": result.get("top_words")}):
+                        self.processed += 1
+                self.scraper.adjust_workers(len(futures) + len(done) >= self.scraper.worker_limit())
+        
+        self.logger.info(f"Work queue is drained, this worker processed {self.processed} articles")
+        if not self.queue.claim_export(self.owner):
+            self.logger.info("The category files are written by another worker")
+            return
+        try:
+            self.export(job["categories"])
+        except BaseException:
+            self.queue.release_export(self.owner)
+            raise
+        self.queue.finish_export(self.owner)
+
+
+    def export(self, categories):
+        for category in categories:
+            if not self.queue.claim_export(self.owner):
+                raise RuntimeError("Another worker took over writing the category files")
+            writer = self.scraper.open_writer(category)
+            try:
+                for article, content in self.queue.iter_category(category):
+                    if content is None:
+                        continue
+                    article = self.scraper.apply_content(article, content["content"], content["top_words"])
+                    if self.scraper.search_index:
+                        self.scraper.search_index.add(category, article)
+                    if self.scraper.near_duplicate_index:
+                        self.scraper.near_duplicate_index.add(category, article)
+                    writer.write(self.scraper.format_article(article))
+            except Exception:
+                writer.abort()
+                raise
+            writer.close()
+            self.logger.info(f"Wrote {writer.count} {category} articles from the work queue")
+
+
+
+
+class BackfillWorker:
+
+    POLL_INTERVAL = 1
+
+
+    def __init__(self, scraper, checkpoint):
+        self.scraper = scraper
+        self.checkpoint = checkpoint
+        self.config = scraper.config
+        self.logger = scraper.logger
+        self.since = self.config.backfill_since
+        self.until = self.config.backfill_until
+        self.pagers = {}
+        self.oldest = {}
+        self.queues = {}
+        self.windows = {}
+        self.pending = Counter()
+        self.listing_failed = set()
+        self.written = 0
+        self.total = 0
+
+
+    def window_bounds(self):
+        bounds = []
+        start = self.since
+        while start <= self.until:
+            end = min(start + datetime.timedelta(days=self.config.window_days - 1), self.until)
+            bounds.append((start.isoformat(), end.isoformat()))
+            start = end + datetime.timedelta(days=1)
+        return bounds
+
+
+    def window_of(self, day):
+        offset = (datetime.date.fromisoformat(day) - self.since).days // self.config.window_days
+        return (self.since + datetime.timedelta(days=offset * self.config.window_days)).isoformat()
+
+
+    def run(self, categories):
+        bounds = self.window_bounds()
+        self.checkpoint.start({
+            "since": self.since.isoformat(),
+            "until": self.until.isoformat(),
+            "window_days": self.config.window_days
+        }, categories, bounds)
+        
+        for category in categories:
+            done, oldest, seen = self.checkpoint.listing(category)
+            pager = NewsListPager(sys.maxsize, self.config.page_size, seen)
+            pager.done = done
+            self.pagers[category] = pager
+            self.oldest[category] = oldest
+            self.windows[category] = {start: end for start, end, state in self.checkpoint.windows(category) if state != "written"}
+            self.total += len(bounds)
+            self.written += len(bounds) - len(self.windows[category])
+            self.queues[category] = deque()
+            for window, article in self.checkpoint.pending_articles(category):
+                if window in self.windows[category]:
+                    self.queues[category].append((window, article))
+                    self.pending[(category, window)] += 1
+            self.finish_windows(category)
+        self.logger.info(f"Backfilling {', '.join(categories)} from {self.since} to {self.until} in {self.total} windows "
+                         f"({self.written} written before, {sum(self.pending.values())} articles to resume)")
+        
+        abandoned = False
+        executor = DaemonThreadPoolExecutor(max_workers=self.scraper.pool_size())
+        try:
+            futures = {}
+            while True:
+                if self.scraper.deadline_passed():
+                    self.logger.error(f"Run deadline of {self.config.deadline}s reached, run the backfill again to resume")
+                    self.scraper.errors_occurred = True
+                    abandoned = True
+                    break
+                
+                free = max(self.scraper.worker_limit() - len(futures), 0)
+                listing = {category for category, window, _ in futures.values() if window is None}
+                for category, pager in self.pagers.items():
+                    if free and not pager.done and category not in listing and len(self.queues[category]) < self.config.page_size:
+                        limit, exclude_ids = pager.next_request()
+                        futures[executor.submit(self.scraper.get_news_page, category, limit, exclude_ids)] = (category, None, limit)
+                        free -= 1
+                while free and any(self.queues.values()):
+                    for category, queue in self.queues.items():
+                        if free and queue:
+                            window, article = queue.popleft()
+                            futures[executor.submit(self.scraper.fetch_article_content, article)] = (category, window, article)
+                            free -= 1
+                
+                if not futures:
+                    break
+                
+                done, _ = wait(futures, timeout=self.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    category, window, article = futures.pop(future)
+                    if window is None:
+                        try:
+                            news_list = future.result()
+                        except Exception:
+                            self.pagers[category].done = True
+                            self.listing_failed.add(category)
+                            continue
+                        self.add_news_page(category, news_list, article)
+                        continue
+                    
+                    try:
+                        result = future.result()
+                    except Exception:
+                        self.checkpoint.fail_article(category, article["link"])
+                    else:
+                        self.checkpoint.complete_article(category, article["link"], {"content": result["content"],
+                                                                                     "top_words": result.get("top_words")})
+                    self.pending[(category, window)] -= 1
+                    self.finish_window(category, window)
+                self.scraper.adjust_workers(len(futures) + len(done) >= self.scraper.worker_limit())
+        except BaseException:
+            abandoned = True
+            raise
+        finally:
+            executor.shutdown(wait=not abandoned, cancel_futures=True)
+        
+        if self.written < self.total:
+            self.logger.error(f"Backfill stopped with {self.total - self.written} of {self.total} windows unfinished, "
+                              f"run it again to resume")
+            self.scraper.errors_occurred = True
+        else:
+            self.logger.info(f"Backfill finished, all {self.total} windows are written")
+
+
+    def add_news_page(self, category, news_list, limit):
+        pager = self.pagers[category]
+        fresh = pager.add_page(news_list, limit)
+        since = self.since.isoformat()
+        until = self.until.isoformat()
+        articles = []
+        for article in fresh:
+            day = article["date"][:10]
+            if day < since:
+                pager.done = True
+            elif day <= until and self.window_of(day) in self.windows[category]:
+                articles.append((self.window_of(day), article))
+        
+        days = [article["date"][:10] for article in fresh]
+        if self.oldest[category]:
+            days.append(self.oldest[category])
+        self.oldest[category] = min(days, default=None)
+        self.checkpoint.add_page(category, [news_id_from_link(article["link"]) for article in fresh],
+                                 articles, self.oldest[category], pager.done)
+        for window, article in articles:
+            self.queues[category].append((window, article))
+            self.pending[(category, window)] += 1
+        if pager.done:
+            self.logger.info(f"Finished listing {category} back to {self.since}")
+        self.finish_windows(category)
+
+
+    def listed(self, category, window):
+        if category in self.listing_failed:
+            return False
+        oldest = self.oldest[category]
+        return self.pagers[category].done or (oldest is not None and oldest < window)
+
+
+    def finish_windows(self, category):
+        for window in sorted(self.windows[category], reverse=True):
+            self.finish_window(category, window)
+
+
+    def finish_window(self, category, window):
+        if window not in self.windows[category] or self.pending[(category, window)] or not self.listed(category, window):
+            return
+        
+        end = self.windows[category].pop(window)
+        writer = self.scraper.open_writer(category, self.scraper.window_path(category, window, end))
+        try:
+            for article, content in self.checkpoint.iter_window(category, window):
+                article = self.scraper.apply_content(article, content["content"], content["top_words"])
+                if self.scraper.search_index:
+                    self.scraper.search_index.add(category, article)
+                if self.scraper.near_duplicate_index:
+                    self.scraper.near_duplicate_index.add(category, article)
+                writer.write(self.scraper.format_article(article))
+        except Exception:
+            writer.abort()
+            raise
+        writer.close()
+        
+        failed = self.checkpoint.failed_articles(category, window)
+        self.checkpoint.finish_window(category, window, "incomplete" if failed else "written")
+        if failed:
+            self.logger.error(f"Wrote {writer.count} {category} articles published {window} to {end} without "
+                              f"{failed} failed articles, run the backfill again to retry them")
+            self.scraper.errors_occurred = True
+            return
+        self.written += 1
+        self.logger.info(f"Wrote {writer.count} {category} articles published {window} to {end} "
+                         f"({self.written} of {self.total} windows)")
+
+
+
+
+class TermCounter:
+
+    def __init__(self, ngrams=1):
+        self.ngrams = ngrams
+        self.articles = 0
+        self.terms = Counter()
+
+
+    def add(self, text_data):
+        tokens = tokenize(text_data)
+        self.terms.update(tokens)
+        for n in range(2, self.ngrams + 1):
+            self.terms.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        self.articles += 1
+        return self
+
+
+    def merge(self, other):
+        self.terms.update(other.terms)
+        self.articles += other.articles
+        return self
+
+
+    def top(self, n):
+        return {
+            "articles": self.articles,
+            "top_terms": [{"term": term, "count": count} for term, count in self.terms.most_common(n)]
+        }
+
+
+
+
+class CorpusTermReport:
+
+    def __init__(self, ngrams=1, top_n=50):
+        self.ngrams = ngrams
+        self.top_n = top_n
+        self.run = TermCounter(ngrams)
+        self.run_days = {}
+        self.categories = {}
+        self.category_days = {}
+        self.finished = {}
+
+
+    def add(self, category, article):
+        counter = TermCounter(self.ngrams).add(article["content"])
+        day = article["date"][:10]
+        
+        self.run.merge(counter)
+        self.run_days.setdefault(day, TermCounter(self.ngrams)).merge(counter)
+        self.categories.setdefault(category, TermCounter(self.ngrams)).merge(counter)
+        self.category_days.setdefault(category, {}).setdefault(day, TermCounter(self.ngrams)).merge(counter)
+
+
+    def category_report(self, category):
+        days = self.category_days.get(category, {})
+        return {
+            "category": category,
+            **self.categories.get(category, TermCounter(self.ngrams)).top(self.top_n),
+            "days": {day: days[day].top(self.top_n) for day in sorted(days)}
+        }
+
+
+    def finish_category(self, category, path):
+        report = self.category_report(category)
+        write_json_atomic(path, report)
+        self.finished[category] = {"articles": report["articles"], "top_terms": report["top_terms"]}
+        self.categories.pop(category, None)
+        self.category_days.pop(category, None)
+
+
+    def write_run(self, path):
+        write_json_atomic(path, {
+            **self.run.top(self.top_n),
+            "categories": self.finished,
+            "days": {day: self.run_days[day].top(self.top_n) for day in sorted(self.run_days)}
+        })
+
+
+
+
+class ArticleStream:
+
+    CHUNK_SIZE = 8192
+    DRAIN_BYTES = 256 * 1024
+    BODY_CLASS = "text-block"
+
+
+    def __init__(self, encoding=None):
+        self.parser = etree.HTMLPullParser(events=("start", "end"), encoding=encoding)
+        self.chunks = []
+        self.size = 0
+        self.body = None
+        self.complete = False
+
+
+    def feed(self, chunk):
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        self.parser.feed(chunk)
+        for event, element in self.parser.read_events():
+            if (event == "start" and self.body is None and element.tag == "div"
+                    and self.BODY_CLASS in (element.get("class") or "").split()):
+                self.body = element
+            elif event == "end" and element is self.body:
+                self.complete = True
+        return self.complete
+
+
+    def remaining(self, headers, received):
+        length = headers.get("Content-Length")
+        if headers.get("Content-Encoding") or not length or not length.isdigit():
+            return None
+        return max(int(length) - received, 0)
+
+
+    def content(self):
+        return b"".join(self.chunks)
+
+
+
+
+class ArticleExtractor:
+
+    BACKENDS = ("auto", "lxml", "bs4")
+    LEAD_XPATH = etree.XPath(
+        "(//div[contains(concat(' ', normalize-space(@class), ' '), ' news-header__lead ')])[1]"
+    )
+    PARAGRAPHS_XPATH = etree.XPath(
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' text-block ')]//p"
+    )
+    TEXT_XPATH = etree.XPath("string()")
+
+
+    def __init__(self, backend="auto"):
+        self.backend = backend
+
+
+    def extract(self, html):
+        if self.backend == "bs4":
+            return self.extract_bs4(html)
+        
+        contents = self.extract_lxml(html)
+        if not contents and self.backend == "auto":
+            return self.extract_bs4(html)
+        return contents
+
+
+    def extract_lxml(self, html):
+        if not html.strip():
+            return []
+        
+        root = etree.HTML(html)
+        if root is None:
+            return []
+        
+        contents = [self.TEXT_XPATH(lead).strip() for lead in self.LEAD_XPATH(root)]
+        contents.extend(self.TEXT_XPATH(p).strip() for p in self.PARAGRAPHS_XPATH(root))
+        return contents
+
+
+    def extract_bs4(self, html):
+        soup = BeautifulSoup(html, "lxml")
+        contents = []
+        
+        if header_lead := soup.select_one("div.news-header__lead"):
+            contents.append(header_lead.text.strip())
+            
+        for p in soup.select("div.text-block p"):
+            contents.append(p.text.strip())
+        
+        return contents
+
+
+
+
+class NewsScraper:
+
+    CATEGORY_MAP = {
+        "politics": 4954,
+        "world": 4844,
+        "economy": 4845,
+        "defense": 4953,
+        "science": 4957,
+        "emergencies": 4992,
+        "society": 4956,
+        "pressreview": 4981,
+        "sports": 4869
+    }
+
+
+    def __init__(self, config):
+        config.validate()
+        self.config = config
+        self.output_dir = Path(config.output_dir).resolve()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / "logs").mkdir(parents=True, exist_ok=True)
+        self.logger = self._setup_logger()
+        self.metrics = RunMetrics()
+        self.response_cache = self._setup_response_cache()
+        self.session = self._setup_session()
+        self.user_agent_rotator = UserAgentRotator(self.logger, self.output_dir / "browser_versions.json")
+        self.rate_limiter = self._setup_rate_limiter()
+        self.output_format = "csv" if config.use_csv else config.output_format
+        self.extractor = ArticleExtractor(config.parser)
+        self.term_report = CorpusTermReport(config.ngrams, config.report_top) if config.term_report else None
+        self.article_index = ArticleIndex(self.output_dir / "articles.sqlite") if config.incremental or config.watch else None
+        self.search_index = SearchIndex(self.output_dir / "search.sqlite") if config.build_index else None
+        self.near_duplicate_index = self._setup_near_duplicate_index()
+        self.archive = None
+        self.latency = LatencyTracker()
+        self.concurrency = self._setup_concurrency()
+        self.hedge_executor = None
+        self.deadline_at = None
+        self.shared_downloads = 0
+        self.errors_occurred = False
+        
+
+    def _setup_session(self):
+        session = requests.Session()
+        retry_strategy = MetricsRetry(
+            total=self.config.max_retries,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=["GET", "POST"],
+            metrics=self.metrics,
+            time_left=self.time_left
+        )
+        pool_size = self.pool_size() * (2 if self.config.hedge_percentile else 1)
+        if self.config.http2:
+            client = httpx.Client(http2=True,
+                                  verify=self.ssl_context() or True,
+                                  limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+            if self.response_cache:
+                adapter = CachingHttp2Adapter(self.response_cache, client, max_retries=retry_strategy)
+            else:
+                adapter = Http2Adapter(client, max_retries=retry_strategy)
+        elif self.response_cache:
+            adapter = CachingHTTPAdapter(self.response_cache, pool_maxsize=pool_size, max_retries=retry_strategy,
+                                         connection_stats=self.metrics.connections)
+        else:
+            adapter = CountingHTTPAdapter(pool_maxsize=pool_size, max_retries=retry_strategy,
+                                          connection_stats=self.metrics.connections)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if self.config.ca_bundle:
+            session.verify = self.config.ca_bundle
+        return session
+
+
+    def ssl_context(self):
+        if not self.config.ca_bundle:
+            return None
+        return ssl.create_default_context(cafile=self.config.ca_bundle)
+
+
+    def _setup_response_cache(self):
+        if not self.config.use_cache:
+            return None
+        return ResponseCache(self.output_dir / "http_cache.sqlite",
+                             self.config.cache_ttl,
+                             self.config.cache_max_mb * 1024 * 1024)
+
+
+    def _setup_near_duplicate_index(self):
+        if not self.config.near_duplicates:
+            return None
+        return NearDuplicateIndex(self.output_dir / "near_duplicates.sqlite", self.config.similarity)
+
+
+    def _setup_rate_limiter(self):
+        if self.config.rate is None:
+            return None
+        return RateLimiter(self.config.rate, self.config.burst, self.config.jitter, self.config.rate_per_host)
+
+
+    def _setup_concurrency(self):
+        if not self.config.auto_workers:
+            return None
+        return ConcurrencyController(self.config.max_workers,
+                                     self.config.min_workers,
+                                     self.config.max_auto_workers,
+                                     self.metrics)
+
+
+    def _setup_logger(self):
+        logging.setLoggerClass(ColoredLogger)
+        logger = logging.getLogger('NewsScraper')
+        logger.setLevel(logging.INFO)
+        
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_formatter = logging.Formatter('%(message)s')
+        console_handler.setFormatter(console_formatter)
+        
+        log_path = Path(self.config.output_dir) / 'logs' / 'scraper.log'
+        file_handler = logging.FileHandler(log_path)
+        file_handler.setLevel(logging.DEBUG)
+        file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler.setFormatter(file_formatter)
+        
+        logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
+        
+        return logger
+        
+
+    def get_top_words(self, text_data):
+        if not self.config.include_top_words:
+            return []
+        start = time.perf_counter()
+        top_words = count_top_words(text_data)
+        self.metrics.observe("top_words", time.perf_counter() - start)
+        return top_words
+
+
+    def article_headers(self):
+        return {
+            "User-Agent": self.user_agent_rotator.get_next_user_agent(),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.5",
+            "DNT": "1",
+            "Connection": "keep-alive",
+        }
+
+
+    def news_list_headers(self, category):
+        return {
+            "Host": urlparse(self.config.base_url).netloc,
+            "User-Agent": self.user_agent_rotator.get_next_user_agent(),
+            "Accept": "application/json",
+            "Content-Type": "application/json;charset=utf-8",
+            "Origin": self.config.base_url,
+            "DNT": "1",
+            "Referer": f"{self.config.base_url}/{category}",
+        }
+
+
+    def news_list_payload(self, category, limit=None, exclude_ids=""):
+        payload = {
+            "sectionId": self.CATEGORY_MAP[category],
+            "limit": limit or self.config.headlines_per_category,
+            "type": "all",
+            "imageSize": 434
+        }
+        if exclude_ids:
+            payload["excludeNewsIds"] = exclude_ids
+        return payload
+
+
+    def parse_news_list(self, data):
+        return [{
+            "title": item["title"],
+            "description": item["lead"],
+            "date": str(datetime.datetime.fromtimestamp(item["date"])),
+            "link": f"{self.config.base_url}{item['link']}"
+        } for item in data["newsList"]]
+
+
+    def parse_article(self, article, html):
+        start = time.perf_counter()
+        contents = self.extractor.extract(html)
+        self.metrics.observe("parse", time.perf_counter() - start)
+            
+        if not contents:
+            raise ValueError("No content found in article")
+            
+        return self.apply_content(article, contents)
+
+
+    def apply_parse_job(self, article, result):
+        contents, top_words, (parse_seconds, top_words_seconds) = result
+        self.metrics.observe("parse", parse_seconds)
+        if top_words is not None:
+            self.metrics.observe("top_words", top_words_seconds)
+        return self.apply_content(article, contents, top_words)
+
+
+    def apply_content(self, article, contents, top_words=None):
+        article["content"] = contents
+        if self.config.include_top_words:
+            article["top_words"] = self.get_top_words(contents) if top_words is None else top_words
+        return article
+
+
+    def news_list_url(self):
+        return f"{self.config.base_url}/userApi/categoryNewsList"
+
+
+    def wait_turn(self, url):
+        self.pause(self.turn_delay(url))
+
+
+    def turn_delay(self, url):
+        if self.response_cache and self.response_cache.is_fresh(url):
+            return 0
+        if self.rate_limiter:
+            return self.rate_limiter.reserve(url)
+        return random.uniform(self.config.min_delay, self.config.max_delay)
+
+
+    def hedge_delays(self, url):
+        if self.rate_limiter and not (self.response_cache and self.response_cache.is_fresh(url)):
+            yield self.rate_limiter.next_free(url)
+        yield self.turn_delay(url)
+
+
+    def pause(self, delay):
+        time_left = self.time_left()
+        time.sleep(delay if time_left is None else min(delay, time_left))
+        if self.deadline_passed():
+            raise TimeoutError(f"Run deadline of {self.config.deadline}s reached")
+
+
+    def fetch_article_content(self, article):
+        self.wait_turn(article["link"])
+        return self._fetch_article_content(article)
+
+
+    def _fetch_article_content(self, article):
+        html = self._download_article(article)
+        try:
+            return self.parse_article(article, html)
+        except Exception as e:
+            self.article_error(article, e)
+            raise
+
+
+    def download_article(self, article):
+        self.wait_turn(article["link"])
+        return self._download_article(article)
+
+
+    def _download_article(self, article):
+        start = time.perf_counter()
+        try:
+            if self.hedge_executor is not None:
+                return self._hedged_get_page(article["link"])
+            return self._get_page(article["link"])
+            
+        except requests.exceptions.RequestException as e:
+            if not self.deadline_passed():
+                self.logger.error(f"Network error while fetching {article['link']}: {e}")
+                self.errors_occurred = True
+            raise
+        except Exception as e:
+            self.article_error(article, e)
+            raise
+        finally:
+            self.metrics.observe("download", time.perf_counter() - start)
+
+
+    def _get_page(self, url):
+        start = time.monotonic()
+        response = self.session.get(url, headers=self.article_headers(), timeout=self.request_timeout(),
+                                    verify=self.session.verify, stream=self.config.stream)
+        if self.config.stream and response.status_code == 200:
+            content = self.read_article_stream(response)
+        else:
+            content = response.content
+        if response.raw is not None:
+            self.metrics.record_response(response.status_code, len(content))
+        response.raise_for_status()
+        if response.raw is not None:
+            self.latency.record(time.monotonic() - start)
+            if self.concurrency:
+                self.concurrency.record(time.monotonic() - start)
+        if self.config.stream:
+            return decode_html(content, response.headers)
+        return response.text
+
+
+    def read_article_stream(self, response):
+        stream = ArticleStream(requests.utils.get_encoding_from_headers(response.headers))
+        for chunk in response.iter_content(ArticleStream.CHUNK_SIZE):
+            if stream.feed(chunk):
+                break
+        else:
+            self.metrics.record_stream(False)
+            return stream.content()
+
+        received = response.raw.tell() if hasattr(response.raw, "tell") else stream.size
+        remaining = stream.remaining(response.headers, received)
+        # httpx never resets an HTTP/2 stream closed early, its unread data would use up the shared connection window
+        http2 = isinstance(response.raw, Http2ResponseBody)
+        if http2 or remaining is None or remaining <= ArticleStream.DRAIN_BYTES:
+            drained = 0
+            for chunk in response.iter_content(ArticleStream.CHUNK_SIZE):
+                drained += len(chunk)
+                if drained > ArticleStream.DRAIN_BYTES and not http2:
+                    break
+            else:
+                self.metrics.record_stream(False)
+                return stream.content()
+        
+        response.close()
+        self.metrics.record_stream(True, remaining or 0)
+        return stream.content()
+
+
+    def _hedged_get_page(self, url):
+        threshold = self.latency.percentile(self.config.hedge_percentile)
+        if threshold is None:
+            return self._get_page(url)
+        
+        primary = self.hedge_executor.submit(self._get_page, url)
+        for timeout in itertools.chain([threshold], self.hedge_delays(url)):
+            try:
+                return primary.result(timeout=timeout)
+            except FuturesTimeoutError:
+                pass
+        
+        backup = self.hedge_executor.submit(self._get_page, url)
+        self.latency.record_hedge()
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self.latency.record_hedge(won=True)
+                    return future.result()
+        return primary.result()
+
+
+    def worker_limit(self):
+        if self.concurrency:
+            return self.concurrency.limit
+        return self.config.max_workers
+
+
+    def pool_size(self):
+        if self.config.auto_workers:
+            return self.config.max_auto_workers
+        return self.config.max_workers
+
+
+    def adjust_workers(self, saturated, scheduler=None):
+        if not self.concurrency:
+            return
+        if saturated:
+            self.concurrency.saturated = True
+        decision = self.concurrency.update()
+        if decision:
+            if scheduler is not None:
+                scheduler._interrupt_progress()
+            self.logger.info(decision)
+
+
+    def request_timeout(self):
+        time_left = self.time_left()
+        if time_left is None:
+            return self.config.connect_timeout, self.config.read_timeout
+        return max(min(self.config.connect_timeout, time_left), 0.1), max(min(self.config.read_timeout, time_left), 0.1)
+
+
+    def time_left(self):
+        if self.deadline_at is None:
+            return None
+        return max(self.deadline_at - time.monotonic(), 0)
+
+
+    def deadline_passed(self):
+        return self.time_left() == 0
+
+
+    def abandon_run(self, scheduler, in_flight):
+        scheduler._interrupt_progress()
+        self.logger.error(f"Run deadline of {self.config.deadline}s reached, writing partial results")
+        self.errors_occurred = True
+        scheduler.abandon(in_flight)
+
+
+    def article_error(self, article, error):
+        if self.deadline_passed():
+            return
+        self.logger.error(f"Error processing {article['link']}: {error}")
+        self.errors_occurred = True
+
+
+    def create_parse_pool(self):
+        if not self.config.parse_procs:
+            return None
+        return ProcessPoolExecutor(max_workers=self.config.parse_procs)
+
+
+    def get_news_list(self, category):
+        return list(self.iter_news_list(category))
+
+
+    def iter_news_list(self, category):
+        pager = NewsListPager(self.config.headlines_per_category, self.config.page_size)
+        while not pager.done:
+            limit, exclude_ids = pager.next_request()
+            yield from pager.add_page(self.get_news_page(category, limit, exclude_ids), limit)
+
+
+    def get_news_page(self, category, limit, exclude_ids=""):
+        if self.rate_limiter:
+            self.pause(self.rate_limiter.reserve(self.news_list_url()))
+        return self._get_news_page(category, limit, exclude_ids)
+
+
+    def _get_news_page(self, category, limit, exclude_ids=""):
+        if not exclude_ids:
+            self.logger.info(f"Fetching news list for category: {category}")
+        
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.news_list_url(),
+                headers=self.news_list_headers(category),
+                json=self.news_list_payload(category, limit, exclude_ids),
+                timeout=self.request_timeout(),
+                verify=self.session.verify
+            )
+            self.metrics.record_response(response.status_code, len(response.content))
+            response.raise_for_status()
+            return self.parse_news_list(response.json())
+        except Exception as e:
+            self.news_list_error(category, e)
+            raise
+        finally:
+            self.metrics.observe("list_fetch", time.perf_counter() - start)
+
+
+    def news_list_error(self, category, error):
+        if self.deadline_passed():
+            return
+        if isinstance(error, requests.exceptions.RequestException) or (aiohttp and isinstance(error, aiohttp.ClientError)):
+            self.logger.error(f"Network error while fetching news list for {category}: {error}")
+        else:
+            self.logger.error(f"Error processing news list for {category}: {error}")
+        self.errors_occurred = True
+
+
+    def flatten_article(self, article):
+        flat_article = {
+            'title': article['title'],
+            'description': article['description'],
+            'date': article['date'],
+            'link': article['link'],
+            'content': ' '.join(article['content'])
+        }
+        
+        if self.config.include_top_words and 'top_words' in article:
+            for i, word_info in enumerate(article['top_words'], 1):
+                flat_article[f'top_word_{i}'] = word_info['word']
+                flat_article[f'top_word_{i}_count'] = word_info['count']
+        
+        return flat_article
+
+
+    def csv_fieldnames(self):
+        fieldnames = ['title', 'description', 'date', 'link', 'content']
+        if self.config.include_top_words:
+            for i in range(1, 11):
+                fieldnames.extend([f'top_word_{i}', f'top_word_{i}_count'])
+        return fieldnames
+
+
+    def save_to_csv(self, articles, output_path):
+        if not articles:
+            return
+
+        flattened_articles = [self.flatten_article(article) for article in articles]
+
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=flattened_articles[0].keys())
+            writer.writeheader()
+            writer.writerows(flattened_articles)
+
+
+    def output_path(self, category):
+        return Path(self.config.output_dir) / f"{category}_{self.config.headlines_per_category}.{self.output_format}"
+
+
+    def window_path(self, category, start, end):
+        return Path(self.config.output_dir) / f"{category}_{start}_{end}.{self.output_format}"
+
+
+    def term_report_path(self, category=None):
+        name = f"{category}_{self.config.headlines_per_category}" if category else f"run_{self.config.headlines_per_category}"
+        return Path(self.config.output_dir) / f"{name}_top_terms.json"
+
+
+    def duplicates_path(self):
+        return Path(self.config.output_dir) / f"duplicates_{self.config.headlines_per_category}.json"
+
+
+    def near_duplicates_path(self):
+        return Path(self.config.output_dir) / f"near_duplicates_{self.config.headlines_per_category}.json"
+
+
+    def open_writer(self, category, path=None):
+        path = path or self.output_path(category)
+        if self.output_format == "csv":
+            return CsvArticleWriter(path, self.csv_fieldnames())
+        if self.output_format == "jsonl":
+            return JsonLinesArticleWriter(path)
+        if self.output_format == "parquet":
+            return ParquetArticleWriter(Path(self.config.output_dir) / "parquet", category, self.config.include_top_words)
+        if self.output_format == "archive":
+            if self.archive is None:
+                self.archive = ArchiveWriter(Path(self.config.output_dir) / "archive", self.config.archive_shard_mb * 1024 * 1024)
+            return ArchiveCategoryWriter(self.archive, category)
+        return JsonArticleWriter(path)
+
+
+    def format_article(self, article):
+        if self.output_format == "csv":
+            return self.flatten_article(article)
+        return article
+
+
+    def _submit(self, executor, category, index, article, paced, parse):
+        if index is None:
+            return executor.submit(self._get_news_page if paced else self.get_news_page, category, *article)
+        if parse:
+            return executor.submit(self._fetch_article_content if paced else self.fetch_article_content, article)
+        return executor.submit(self._download_article if paced else self.download_article, article)
+
+
+    def _run_threaded(self, scheduler):
+        delayed = []
+        sequence = itertools.count()
+        page = {}
+        parse_backlog = deque()
+        parse_limit = self.config.parse_procs * 2
+        abandoned = False
+        
+        executor = DaemonThreadPoolExecutor(max_workers=self.pool_size())
+        parse_pool = self.create_parse_pool()
+        parse = parse_pool is None
+        futures = {}
+        parsing = {}
+        
+        try:
+            while futures or delayed or parsing or parse_backlog or scheduler.has_queued():
+                if self.deadline_passed():
+                    in_flight = [(category, index) for category, index, _ in futures.values()]
+                    in_flight.extend((category, index) for category, index, _ in parsing.values())
+                    in_flight.extend((category, index) for category, index, _, _ in parse_backlog)
+                    in_flight.extend((category, index) for _, _, category, index, _ in delayed)
+                    self.abandon_run(scheduler, in_flight)
+                    abandoned = True
+                    break
+                
+                while parse_backlog and len(parsing) < parse_limit:
+                    category, index, article, html = parse_backlog.popleft()
+                    future = parse_pool.submit(parse_article_job, html, self.config.parser, self.config.include_top_words)
+                    parsing[future] = (category, index, article)
+                
+                while (scheduler.has_queued() and len(futures) + len(delayed) < self.worker_limit()
+                       and (parse or len(parse_backlog) < parse_limit)):
+                    category, index, article = scheduler.next_task()
+                    if index is None:
+                        page[category] = article[0]
+                    if self.rate_limiter:
+                        url = self.news_list_url() if index is None else article["link"]
+                        ready_at = time.monotonic() + self.turn_delay(url)
+                        heapq.heappush(delayed, (ready_at, next(sequence), category, index, article))
+                    else:
+                        future = self._submit(executor, category, index, article, False, parse)
+                        futures[future] = (category, index, article)
+                
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, _, category, index, article = heapq.heappop(delayed)
+                    futures[self._submit(executor, category, index, article, True, parse)] = (category, index, article)
+                
+                wake_times = [delayed[0][0]] if delayed else []
+                if self.deadline_at is not None:
+                    wake_times.append(self.deadline_at)
+                timeout = max(min(wake_times) - now, 0) if wake_times else None
+                if not futures and not parsing:
+                    if timeout is not None:
+                        time.sleep(timeout)
+                    continue
+                
+                done, _ = wait([*futures, *parsing], timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in parsing:
+                        category, index, article = parsing.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            self.article_error(article, e)
+                            scheduler.article_failed(category, index, e)
+                            continue
+                        scheduler.article_done(category, index, self.apply_parse_job(article, result))
+                        continue
+                    
+                    category, index, article = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        if index is None:
+                            scheduler.fail_category(category, e)
+                        else:
+                            scheduler.article_failed(category, index, e)
+                        continue
+                    
+                    if index is None:
+                        scheduler.add_news_page(category, result, page[category])
+                    elif parse:
+                        scheduler.article_done(category, index, result)
+                    else:
+                        parse_backlog.append((category, index, article, result))
+                
+                self.adjust_workers(scheduler.has_queued() and len(futures) + len(done) >= self.worker_limit(),
+                                    scheduler)
+        except BaseException:
+            abandoned = True
+            raise
+        finally:
+            executor.shutdown(wait=not abandoned, cancel_futures=True)
+            if parse_pool is not None:
+                for future in parsing:
+                    future.cancel()
+                parse_pool.shutdown(wait=not abandoned)
+
+
+    def process_categories(self, categories):
+        scheduler = RunScheduler(self, categories)
+        if self.config.deadline:
+            self.deadline_at = time.monotonic() + self.config.deadline
+        if self.config.hedge_percentile and self.config.engine == "threads":
+            self.hedge_executor = DaemonThreadPoolExecutor(max_workers=self.pool_size() * 2)
+        
+        try:
+            if self.config.engine == "async":
+                AsyncFetchEngine(self).run(scheduler)
+            else:
+                self._run_threaded(scheduler)
+            if self.term_report:
+                self.term_report.write_run(self.term_report_path())
+            duplicates = scheduler.duplicate_report()
+            if duplicates:
+                write_json_atomic(self.duplicates_path(), duplicates)
+        except Exception as e:
+            self.logger.error(f"Error processing categories: {e}")
+            self.errors_occurred = True
+        finally:
+            if self.hedge_executor is not None:
+                self.hedge_executor.shutdown(wait=False, cancel_futures=True)
+                self.hedge_executor = None
+        self.export_metrics()
+
+
+    def watch(self, categories):
+        watcher = CategoryWatcher(self, categories)
+        if self.config.hedge_percentile and self.config.engine == "threads":
+            self.hedge_executor = DaemonThreadPoolExecutor(max_workers=self.pool_size() * 2)
+        
+        self.logger.info(f"Watching {', '.join(categories)} for new articles, press Ctrl+C to stop")
+        try:
+            if self.config.engine == "async":
+                AsyncFetchEngine(self).watch(watcher)
+            else:
+                while True:
+                    time.sleep(watcher.sleep_time())
+                    scheduler = watcher.start_cycle()
+                    self._run_threaded(scheduler)
+                    watcher.finish_cycle()
+        except KeyboardInterrupt:
+            self.logger.info("Watch mode stopped")
+        finally:
+            watcher.close()
+            if self.hedge_executor is not None:
+                self.hedge_executor.shutdown(wait=False, cancel_futures=True)
+                self.hedge_executor = None
+        self.export_metrics()
+
+
+    def join_queue(self, categories):
+        try:
+            queue = WorkQueue(self.config.join, self.config.lease_seconds)
+            try:
+                QueueWorker(self, queue).run(categories)
+            finally:
+                queue.close()
+        except Exception as e:
+            self.logger.error(f"Error processing work queue {self.config.join}: {e}")
+            self.errors_occurred = True
+        self.export_metrics()
+
+
+    def backfill(self, categories):
+        if self.config.deadline:
+            self.deadline_at = time.monotonic() + self.config.deadline
+        try:
+            checkpoint = BackfillCheckpoint(self.output_dir / "backfill.sqlite")
+            try:
+                BackfillWorker(self, checkpoint).run(categories)
+            finally:
+                checkpoint.close()
+        except Exception as e:
+            self.logger.error(f"Error running backfill: {e}")
+            self.errors_occurred = True
+        self.export_metrics()
+
+
+    def export_metrics(self):
+        try:
+            logs_dir = self.output_dir / "logs"
+            self.metrics.export(logs_dir / "metrics.json", logs_dir / "metrics.prom")
+        except OSError as e:
+            self.logger.error(f"Error writing run metrics: {e}")
+            self.errors_occurred = True
+
+
+    def process_category(self, category):
+        self.process_categories([category])
+
+
+    def run(self):
+        categories = []
+        for category in self.config.categories:
+            if category in self.CATEGORY_MAP:
+                categories.append(category)
+            else:
+                self.logger.error(f"Invalid category: {category}")
+                self.errors_occurred = True
+        
+        if categories and self.config.backfill_since:
+            self.backfill(categories)
+        elif categories and self.config.join:
+            self.join_queue(categories)
+        elif categories and self.config.watch:
+            self.watch(categories)
+        elif categories:
+            self.process_categories(categories)
+            print()
+        if self.search_index:
+            self.search_index.close()
+        if self.near_duplicate_index:
+            self.write_near_duplicates()
+        if self.archive:
+            self.archive.close()
+        if self.response_cache:
+            self.response_cache.close()
+        
+        summary = self.run_summary()
+        if not self.errors_occurred:
+            self.logger.info(Colors.green(f"All tasks have finished successfully.{summary}"))
+        else:
+            self.logger.error(f"Some tasks failed during execution.{summary}")
+
+
+    def write_near_duplicates(self):
+        try:
+            report = self.near_duplicate_index.report()
+            if report:
+                write_json_atomic(self.near_duplicates_path(), report)
+        except (OSError, sqlite3.Error) as e:
+            self.logger.error(f"Error writing near-duplicate report: {e}")
+            self.errors_occurred = True
+        finally:
+            self.near_duplicate_index.close()
+
+
+    def run_summary(self):
+        parts = []
+        if self.config.stream:
+            streams = self.metrics.streams
+            parts.append(f"Stopped {streams['stopped_early']} of {streams['downloads']} article downloads early "
+                         f"({streams['bytes_skipped'] / 1024:.0f} KB left unread)")
+        if self.response_cache:
+            parts.append(self.response_cache.summary())
+        if self.config.hedge_percentile:
+            parts.append(self.latency.summary())
+        if self.concurrency:
+            parts.append(self.concurrency.summary())
+        parts.append(self.metrics.connections.summary())
+        if self.near_duplicate_index:
+            parts.append(self.near_duplicate_index.summary())
+        if self.shared_downloads:
+            parts.append(f"Reused {self.shared_downloads} downloads for articles listed in several categories")
+        return "".join(f" {part}." for part in parts)
+
+
+
+
+class AsyncFetchEngine:
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.config = scraper.config
+        self.logger = scraper.logger
+        self.parse_pool = None
+        self.parse_slots = None
+        self.pacing = 0
+
+
+    def run(self, scheduler):
+        self.parse_pool = self.scraper.create_parse_pool()
+        try:
+            asyncio.run(self._run(scheduler))
+        finally:
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown()
+
+
+    def watch(self, watcher):
+        self.parse_pool = self.scraper.create_parse_pool()
+        try:
+            asyncio.run(self._watch(watcher))
+        finally:
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown()
+
+
+    def client_session(self):
+        self.parse_slots = asyncio.Semaphore(self.config.parse_procs * 2 or 1)
+        connector = aiohttp.TCPConnector(limit=self.scraper.pool_size(), ssl=self.scraper.ssl_context() or True)
+        timeout = aiohttp.ClientTimeout(sock_connect=self.config.connect_timeout, sock_read=self.config.read_timeout)
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._request_started)
+        trace_config.on_connection_create_end.append(self._connection_created)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[trace_config])
+
+
+    async def _request_started(self, session, context, params):
+        self.scraper.metrics.connections.record_request()
+
+
+    async def _connection_created(self, session, context, params):
+        self.scraper.metrics.connections.record_connection(tls=urlparse(self.config.base_url).scheme == "https")
+
+
+    async def _run(self, scheduler):
+        async with self.client_session() as session:
+            await self._drive(session, scheduler)
+
+
+    async def _watch(self, watcher):
+        async with self.client_session() as session:
+            while True:
+                await asyncio.sleep(watcher.sleep_time())
+                scheduler = watcher.start_cycle()
+                await self._drive(session, scheduler)
+                watcher.finish_cycle()
+
+
+    async def _drive(self, session, scheduler):
+        tasks = {}
+        page = {}
+        
+        while tasks or scheduler.has_queued():
+            if self.scraper.deadline_passed():
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self.scraper.abandon_run(scheduler, list(tasks.values()))
+                break
+            
+            while len(tasks) < self.scraper.worker_limit() and scheduler.has_queued():
+                category, index, article = scheduler.next_task()
+                if index is None:
+                    page[category] = article[0]
+                    task = asyncio.ensure_future(self.get_news_page(session, category, *article))
+                else:
+                    task = asyncio.ensure_future(self.fetch_article_content(session, article))
+                tasks[task] = (category, index)
+            
+            deadline_timeout = None
+            if self.scraper.deadline_at is not None:
+                deadline_timeout = max(self.scraper.deadline_at - time.monotonic(), 0)
+            done, _ = await asyncio.wait(tasks, timeout=deadline_timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                category, index = tasks.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    if index is None:
+                        scheduler.fail_category(category, e)
+                    else:
+                        scheduler.article_failed(category, index, e)
+                    continue
+                
+                if index is None:
+                    scheduler.add_news_page(category, result, page[category])
+                else:
+                    scheduler.article_done(category, index, result)
+            
+            self.scraper.adjust_workers(scheduler.has_queued() and len(tasks) + len(done) - self.pacing >= self.scraper.worker_limit(),
+                                        scheduler)
+
+
+    async def _request(self, session, method, url, status=None, **kwargs):
+        retries = 0
+        while True:
+            start = time.monotonic()
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    if status is not None and response.status == status:
+                        self.scraper.metrics.record_response(response.status, 0)
+                        return None, None
+                    if response.status in RETRY_STATUSES and retries < self.config.max_retries:
+                        retry_after = response.headers.get("Retry-After")
+                        self.scraper.metrics.record_retry(response.status)
+                    else:
+                        if self.config.stream and method == "GET" and response.status == 200:
+                            content = await self._read_article_stream(response)
+                        else:
+                            content = await response.read()
+                        self.scraper.metrics.record_response(response.status, len(content))
+                        response.raise_for_status()
+                        if method == "GET":
+                            self.scraper.latency.record(time.monotonic() - start)
+                            if self.scraper.concurrency:
+                                self.scraper.concurrency.record(time.monotonic() - start)
+                        return content, response.headers
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if retries >= self.config.max_retries:
+                    raise
+                retry_after = None
+                self.scraper.metrics.record_retry()
+            
+            retries += 1
+            await asyncio.sleep(retry_delay(retries, retry_after))
+
+
+    async def _read_article_stream(self, response):
+        stream = ArticleStream(response.charset)
+        async for chunk in response.content.iter_chunked(ArticleStream.CHUNK_SIZE):
+            if stream.feed(chunk):
+                break
+        else:
+            self.scraper.metrics.record_stream(False)
+            return stream.content()
+
+        remaining = stream.remaining(response.headers, stream.size)
+        if remaining is None or remaining <= ArticleStream.DRAIN_BYTES:
+            drained = 0
+            async for chunk in response.content.iter_chunked(ArticleStream.CHUNK_SIZE):
+                drained += len(chunk)
+                if drained > ArticleStream.DRAIN_BYTES:
+                    break
+            else:
+                self.scraper.metrics.record_stream(False)
+                return stream.content()
+        
+        response.close()
+        self.scraper.metrics.record_stream(True, remaining or 0)
+        return stream.content()
+
+
+    async def _get(self, session, url, headers):
+        cache = self.scraper.response_cache
+        if cache is None:
+            return await self._request(session, "GET", url, headers=headers)
+        
+        cached = cache.lookup(url)
+        if cached is not None:
+            cached_headers, body, fresh = cached
+            if fresh:
+                cache.record_hit(url)
+                return body, cached_headers
+            headers = {**headers, **cache.conditional_headers(cached_headers)}
+        
+        content, response_headers = await self._request(session, "GET", url, headers=headers, status=304 if cached else None)
+        if response_headers is None:
+            cache.record_revalidation(url)
+            return body, cached_headers
+        
+        if self.config.stream:
+            cache.record_miss()
+        else:
+            cache.store(url, CaseInsensitiveDict(response_headers), content)
+        return content, response_headers
+
+
+    async def _hedged_get(self, session, url, headers):
+        threshold = self.scraper.latency.percentile(self.config.hedge_percentile)
+        primary = asyncio.ensure_future(self._get(session, url, headers))
+        if threshold is None:
+            return await primary
+        
+        for timeout in itertools.chain([threshold], self.scraper.hedge_delays(url)):
+            done, _ = await asyncio.wait({primary}, timeout=timeout)
+            if done:
+                return primary.result()
+        
+        backup = asyncio.ensure_future(self._get(session, url, self.scraper.article_headers()))
+        self.scraper.latency.record_hedge()
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.scraper.latency.record_hedge(won=True)
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+    async def pace(self, delay):
+        self.pacing += 1
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.pacing -= 1
+
+
+    async def fetch_article_content(self, session, article):
+        headers = self.scraper.article_headers()
+        
+        await self.pace(self.scraper.turn_delay(article["link"]))
+        
+        try:
+            start = time.perf_counter()
+            try:
+                if self.config.hedge_percentile:
+                    content, response_headers = await self._hedged_get(session, article["link"], headers)
+                else:
+                    content, response_headers = await self._get(session, article["link"], headers)
+            finally:
+                self.scraper.metrics.observe("download", time.perf_counter() - start)
+            html = decode_html(content, response_headers)
+            if self.parse_pool is None:
+                return self.scraper.parse_article(article, html)
+            
+            async with self.parse_slots:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.parse_pool, parse_article_job, html, self.config.parser, self.config.include_top_words
+                )
+            return self.scraper.apply_parse_job(article, result)
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Network error while fetching {article['link']}: {e}")
+            self.scraper.errors_occurred = True
+            raise
+        except Exception as e:
+            self.logger.error(f"Error processing {article['link']}: {e}")
+            self.scraper.errors_occurred = True
+            raise
+
+
+    async def get_news_page(self, session, category, limit, exclude_ids=""):
+        if self.scraper.rate_limiter:
+            await self.pace(self.scraper.rate_limiter.reserve(self.scraper.news_list_url()))
+        
+        if not exclude_ids:
+            self.logger.info(f"Fetching news list for category: {category}")
+        
+        start = time.perf_counter()
+        try:
+            content, _ = await self._request(
+                session, "POST",
+                self.scraper.news_list_url(),
+                headers=self.scraper.news_list_headers(category),
+                json=self.scraper.news_list_payload(category, limit, exclude_ids)
+            )
+            return self.scraper.parse_news_list(json.loads(content))
+        except Exception as e:
+            self.scraper.news_list_error(category, e)
+            raise
+        finally:
+            self.scraper.metrics.observe("list_fetch", time.perf_counter() - start)
+
+
+
+
+def tokenize(text_data):
+    tokens = []
+    for word in TOKEN_PATTERN.findall(" ".join(text_data).lower()):
+        if word == "s":
+            continue
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word not in STOP_WORDS and not word.isdigit():
+            tokens.append(word)
+    return tokens
+
+
+def count_top_words(text_data, n=10):
+    return [{"word": word, "count": count}
+            for word, count in Counter(tokenize(text_data)).most_common(n)]
+
+
+
+
+def parse_article_job(html, parser, include_top_words):
+    start = time.perf_counter()
+    contents = ArticleExtractor(parser).extract(html)
+    parsed = time.perf_counter()
+    if not contents:
+        raise ValueError("No content found in article")
+    top_words = count_top_words(contents) if include_top_words else None
+    return contents, top_words, (parsed - start, time.perf_counter() - parsed)
+
+
+
+
+def write_json_atomic(path, data):
+    path = Path(path)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+
+
+def retry_delay(retries, retry_after=None):
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    if retries <= 1:
+        return 0
+    return min(RETRY_BACKOFF_FACTOR * (2 ** (retries - 1)), RETRY_BACKOFF_MAX)
+
+
+
+
+def news_id_from_link(link):
+    return link.rstrip("/").rsplit("/", 1)[-1]
+
+
+
+
+def article_key(link):
+    return f"{urlparse(link).netloc.lower()}/{news_id_from_link(link)}"
+
+
+
+
+def link_hash(link):
+    return int.from_bytes(hashlib.blake2b(link.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def archive_timestamp(date):
+    return calendar.timegm(datetime.datetime.fromisoformat(str(date)).timetuple())
+
+
+def compress_frame(data, compression):
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress_frame(data, compression):
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+
+
+def decode_html(content, headers):
+    encoding = requests.utils.get_encoding_from_headers(headers)
+    if encoding is None:
+        encoding = requests.compat.chardet.detect(content)["encoding"] if requests.compat.chardet else "utf-8"
+    return str(content, encoding or "utf-8", errors="replace")
+
+
+
+
+def iter_output_articles(output_dir):
+    output_dir = Path(output_dir)
+    for path in sorted(output_dir.iterdir()):
+        category = path.name.split("_", 1)[0]
+        if category not in NewsScraper.CATEGORY_MAP or not path.is_file():
+            continue
+        if path.suffix == ".json" and not path.name.endswith("_top_terms.json"):
+            with open(path, encoding="utf-8") as f:
+                for article in json.load(f):
+                    yield category, article
+        elif path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield category, json.loads(line)
+        elif path.suffix == ".csv":
+            with open(path, newline="", encoding="utf-8") as f:
+                for article in csv.DictReader(f):
+                    yield category, article
+    
+    parquet_dir = output_dir / "parquet"
+    if pyarrow is not None and parquet_dir.is_dir():
+        dataset = pyarrow.dataset.dataset(parquet_dir, format="parquet", partitioning="hive")
+        for batch in dataset.to_batches(columns=["title", "description", "date", "link", "content", "category"]):
+            for article in batch.to_pylist():
+                article["date"] = str(article["date"])
+                yield article.pop("category"), article
+
+
+
+
+def index_command(argv):
+    parser = argparse.ArgumentParser(prog="tass_scraper index",
+                                     description="Add the articles in an output directory to its full-text search index")
+    parser.add_argument("--output-dir",
+                       default="news_data",
+                       help="Output directory with scraped articles (default: ./news_data)")
+    args = parser.parse_args(argv)
+    
+    output_dir = Path(args.output_dir)
+    if not output_dir.is_dir():
+        parser.error(f"{output_dir} is not a directory")
+    
+    start = time.perf_counter()
+    index = SearchIndex(output_dir / "search.sqlite")
+    scanned = added = 0
+    try:
+        for category, article in iter_output_articles(output_dir):
+            scanned += 1
+            added += index.add(category, article)
+    finally:
+        index.close()
+    print(f"Indexed {added} new articles ({scanned} scanned) in {time.perf_counter() - start:.1f}s")
+
+
+
+
+def near_duplicates_command(argv):
+    parser = argparse.ArgumentParser(prog="tass_scraper near-duplicates",
+                                     description="Add the articles in an output directory to its near-duplicate store "
+                                                 "and report the near-duplicate articles and reused paragraphs among them")
+    parser.add_argument("--output-dir",
+                       default="news_data",
+                       help="Output directory with scraped articles (default: ./news_data)")
+    parser.add_argument("--similarity",
+                       type=float,
+                       default=0.8,
+                       metavar="S",
+                       help="Share of word sequences two articles need in common to count as near-duplicates (default: 0.8)")
+    args = parser.parse_args(argv)
+    
+    output_dir = Path(args.output_dir)
+    if not output_dir.is_dir():
+        parser.error(f"{output_dir} is not a directory")
+    if not 0.5 <= args.similarity <= 1:
+        parser.error("--similarity must be between 0.5 and 1")
+    if numpy is None:
+        parser.error("near-duplicate detection requires the numpy package (pip install numpy)")
+    
+    start = time.perf_counter()
+    index = NearDuplicateIndex(output_dir / "near_duplicates.sqlite", args.similarity)
+    scanned = 0
+    try:
+        for category, article in iter_output_articles(output_dir):
+            scanned += 1
+            index.add(category, article)
+        report = index.report()
+    finally:
+        index.close()
+    if report:
+        write_json_atomic(output_dir / "near_duplicates.json", report)
+    print(f"Added {index.added} new articles ({scanned} scanned) in {time.perf_counter() - start:.1f}s. {index.summary()}")
+
+
+
+
+def search_command(argv):
+    parser = argparse.ArgumentParser(prog="tass_scraper search",
+                                     description="Search the articles indexed with 'tass_scraper index' or --index",
+                                     epilog='Query examples: sanctions, "foreign ministry", lavrov AND NOT zakharova, sanction*')
+    parser.add_argument("query",
+                       help="Words, quoted phrases, AND/OR/NOT and prefix* searches")
+    parser.add_argument("--output-dir",
+                       default="news_data",
+                       help="Output directory with the search index (default: ./news_data)")
+    parser.add_argument("--since",
+                       type=datetime.date.fromisoformat,
+                       metavar="YYYY-MM-DD",
+                       help="Only articles published on or after this day")
+    parser.add_argument("--until",
+                       type=datetime.date.fromisoformat,
+                       metavar="YYYY-MM-DD",
+                       help="Only articles published on or before this day")
+    parser.add_argument("--categories",
+                       nargs="+",
+                       choices=list(NewsScraper.CATEGORY_MAP),
+                       help="Only articles from these categories")
+    parser.add_argument("--limit",
+                       type=int,
+                       default=20,
+                       help="Maximum number of results (default: 20)")
+    args = parser.parse_args(argv)
+    
+    path = Path(args.output_dir) / "search.sqlite"
+    if not path.exists():
+        parser.error(f"no search index in {args.output_dir}, run 'tass_scraper index' or scrape with --index first")
+    
+    index = SearchIndex(path)
+    start = time.perf_counter()
+    try:
+        rows = index.search(
+            args.query,
+            since=args.since.isoformat() if args.since else None,
+            until=(args.until + datetime.timedelta(days=1)).isoformat() if args.until else None,
+            categories=args.categories,
+            limit=args.limit
+        )
+    except sqlite3.OperationalError as e:
+        parser.error(f"invalid query: {e}")
+    finally:
+        index.close()
+    elapsed = (time.perf_counter() - start) * 1000
+    
+    for date, category, title, link, snippet in rows:
+        print(f"{Colors.yellow(date)}  {category}  {title}")
+        print(f"    {link}")
+        print(f"    {' '.join(snippet.split())}")
+        print()
+    print(f"{len(rows)} results in {elapsed:.1f} ms")
+
+
+
+
+def archive_command(argv):
+    parser = argparse.ArgumentParser(prog="tass_scraper archive",
+                                     description="Convert output files into a compressed archive and read articles from it")
+    parser.add_argument("--output-dir",
+                       default="news_data",
+                       help="Output directory with the archive folder (default: ./news_data)")
+    actions = parser.add_subparsers(dest="action", required=True)
+    
+    convert = actions.add_parser("convert", help="Add the articles in the output files to the archive")
+    convert.add_argument("--compression",
+                        choices=["zstd", "gzip"],
+                        default="zstd" if zstandard else "gzip",
+                        help="Shard compression, zstd requires the zstandard package (default: zstd if installed)")
+    convert.add_argument("--shard-mb",
+                        type=int,
+                        default=64,
+                        help="Compressed size in MB after which a new shard is started (default: 64)")
+    
+    get = actions.add_parser("get", help="Print the archived article with this link")
+    get.add_argument("link")
+    
+    date_range = actions.add_parser("range", help="Print the archived articles published between two days as JSON Lines")
+    date_range.add_argument("--since",
+                            type=datetime.date.fromisoformat,
+                            required=True,
+                            metavar="YYYY-MM-DD",
+                            help="First day to include")
+    date_range.add_argument("--until",
+                            type=datetime.date.fromisoformat,
+                            required=True,
+                            metavar="YYYY-MM-DD",
+                            help="Last day to include")
+    date_range.add_argument("--categories",
+                            nargs="+",
+                            choices=list(NewsScraper.CATEGORY_MAP),
+                            help="Only articles from these categories")
+    args = parser.parse_args(argv)
+    
+    root = Path(args.output_dir) / "archive"
+    if args.action == "convert":
+        if args.compression == "zstd" and zstandard is None:
+            parser.error("zstd compression requires the zstandard package (pip install zstandard)")
+        start = time.perf_counter()
+        archive = ArchiveWriter(root, args.shard_mb * 1024 * 1024, args.compression)
+        scanned = 0
+        for category, article in iter_output_articles(args.output_dir):
+            scanned += 1
+            archive.append(category, article)
+        archive.close()
+        print(f"Archived {archive.count} new articles ({scanned} scanned) in {time.perf_counter() - start:.1f}s")
+        return
+    
+    if not (root / "manifest.json").exists():
+        parser.error(f"no archive in {args.output_dir}, run 'tass_scraper archive convert' or scrape with --format archive first")
+    reader = ArchiveReader(root)
+    try:
+        if args.action == "get":
+            article = reader.get(args.link)
+            if article is None:
+                parser.error(f"{args.link} is not in the archive")
+            print(json.dumps(article, indent=4, ensure_ascii=False))
+        else:
+            since = calendar.timegm(args.since.timetuple())
+            until = calendar.timegm((args.until + datetime.timedelta(days=1)).timetuple())
+            for article in reader.range(since, until):
+                if not args.categories or article["category"] in args.categories:
+                    print(json.dumps(article, ensure_ascii=False))
+    finally:
+        reader.close()
+
+
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ("index", "search", "archive", "near-duplicates"):
+        commands = {"index": index_command, "search": search_command, "archive": archive_command,
+                    "near-duplicates": near_duplicates_command}
+        commands[sys.argv[1]](sys.argv[2:])
+        return
+    
+    class CustomFormatter(argparse.HelpFormatter):
+
+        def __init__(self, prog):
+            super().__init__(prog, max_help_position=50, width=100)
+        
+
+        def _format_action_invocation(self, action):
+            if not action.option_strings:
+                metavar = self._metavar_formatter(action, action.dest)(1)
+                return metavar
+            else:
+                parts = []
+                if action.nargs == 0:
+                    parts.extend(action.option_strings)
+                else:
+                    default = action.dest.upper()
+                    args_string = self._format_args(action, default)
+                    for option_string in action.option_strings:
+                        parts.append('%s %s' % (option_string, args_string))
+                return ', '.join(parts)
+        
+
+        def _format_text(self, text):
+            if text.startswith("Available categories:"):
+                return text
+            return super()._format_text(text)
+
+
+    categories_help = "Available categories:\n"
+    category_desc = {
+        "politics": "Russian Politics & Diplomacy",
+        "world": "World",
+        "economy": "Business & Economy",
+        "defense": "Military & Defense",
+        "science": "Science & Space",
+        "emergencies": "Emergencies",
+        "society": "Society & Culture",
+        "pressreview": "Press Review",
         "sports": "Sports"
     }
     for category in NewsScraper.CATEGORY_MAP:
@@ -550,18 +4731,46 @@ def main():
             if category == cat:
                 categories_help += f"  • {category} -- {category_desc[category]}\n"
     
+    backfill = len(sys.argv) > 1 and sys.argv[1] == "backfill"
     parser = argparse.ArgumentParser(
-        description="TASS News Scraper",
+        prog="tass_scraper backfill" if backfill else None,
+        description="Scrape every article published between two days into one file per category and date window, "
+                    "resuming where an earlier backfill stopped" if backfill else "TASS News Scraper",
         formatter_class=CustomFormatter,
         epilog=categories_help
     )
     
+    if backfill:
+        parser.add_argument("--since",
+                           type=datetime.date.fromisoformat,
+                           required=True,
+                           metavar="YYYY-MM-DD",
+                           help="First publication day to scrape")
+        
+        parser.add_argument("--until",
+                           type=datetime.date.fromisoformat,
+                           default=datetime.date.today(),
+                           metavar="YYYY-MM-DD",
+                           help="Last publication day to scrape (default: today)")
+        
+        parser.add_argument("--window-days",
+                           type=int,
+                           default=7,
+                           metavar="N",
+                           help="Number of publication days written to each output file (default: 7)")
+    
     parser.add_argument("--headlines", 
                        type=int, 
                        default=20,
                        metavar="N",
                        help="Number of headlines per category (default: 20)")
     
+    parser.add_argument("--page-size",
+                       type=int,
+                       default=100,
+                       metavar="N",
+                       help="Number of headlines requested per news list page (default: 100)")
+    
     parser.add_argument("--categories", 
                        nargs="+", 
                        default=["politics", "world",
@@ -575,13 +4784,42 @@ def main():
     
     parser.add_argument("--csv",
                        action="store_true",
-                       help="Save output in CSV format instead of JSON")
+                       help="Save output in CSV format instead of JSON (same as --format csv)")
+    
+    parser.add_argument("--format",
+                       choices=["json", "csv", "jsonl", "parquet", "archive"],
+                       default="json",
+                       help="Output format, jsonl writes one article per line as it completes, "
+                            "parquet writes columnar files partitioned by category and date, "
+                            "archive writes compressed shards with a lookup index (default: json)")
     
     parser.add_argument("--workers", 
                        type=int, 
                        default=2,
                        metavar="N",
-                       help="Maximum number of concurrent workers (default: 2)")
+                       help="Maximum number of concurrent workers, the starting value with --auto-workers (default: 2)")
+    
+    parser.add_argument("--auto-workers",
+                       action="store_true",
+                       help="Adjust the number of concurrent downloads during the run from latency, throttling and errors")
+    
+    parser.add_argument("--min-workers",
+                       type=int,
+                       default=1,
+                       metavar="N",
+                       help="Lowest number of concurrent workers with --auto-workers (default: 1)")
+    
+    parser.add_argument("--max-auto-workers",
+                       type=int,
+                       default=32,
+                       metavar="N",
+                       help="Highest number of concurrent workers with --auto-workers (default: 32)")
+    
+    parser.add_argument("--parse-procs",
+                       type=int,
+                       default=0,
+                       metavar="N",
+                       help="Parse pages in N separate processes instead of the download workers (default: 0)")
     
     parser.add_argument("--output-dir", 
                        default="news_data",
@@ -592,6 +4830,22 @@ def main():
                        action="store_true",
                        help="Enable top words analysis (disabled by default)")
     
+    parser.add_argument("--term-report",
+                       action="store_true",
+                       help="Write top terms per category, per day and for the whole run next to the output files")
+    
+    parser.add_argument("--ngrams",
+                       type=int,
+                       default=1,
+                       metavar="N",
+                       help="Also count phrases of up to N words in the term report (default: 1)")
+    
+    parser.add_argument("--report-top",
+                       type=int,
+                       default=50,
+                       metavar="N",
+                       help="Number of terms listed in each part of the term report (default: 50)")
+    
     parser.add_argument("--min-delay", 
                        type=float, 
                        default=0.2,
@@ -609,19 +4863,200 @@ def main():
                        default=3,
                        metavar="N",
                        help="Maximum number of retry attempts (default: 3)")
+    
+    parser.add_argument("--parser",
+                       choices=["auto", "lxml", "bs4"],
+                       default="auto",
+                       help="HTML extraction backend, auto uses lxml and falls back to BeautifulSoup (default: auto)")
+    
+    parser.add_argument("--stream",
+                       action="store_true",
+                       help="Stop downloading an article page as soon as its text has arrived, skipping footers and scripts. "
+                            "Over HTTP/1.1 this closes the connection, so pages with less than 256 KB left are still read to the end")
+    
+    parser.add_argument("--connect-timeout",
+                       type=float,
+                       default=10,
+                       metavar="SEC",
+                       help="Connection timeout for each request in seconds (default: 10)")
+    
+    parser.add_argument("--read-timeout",
+                       type=float,
+                       default=30,
+                       metavar="SEC",
+                       help="Read timeout for each request in seconds (default: 30)")
+    
+    parser.add_argument("--deadline",
+                       type=float,
+                       default=None,
+                       metavar="SEC",
+                       help="Stop the run after SEC seconds and write the articles scraped so far (default: off)")
+    
+    parser.add_argument("--hedge-percentile",
+                       type=float,
+                       default=None,
+                       metavar="P",
+                       help="Send a duplicate article request when the first one is slower than the P-th latency percentile (default: off)")
+    
+    parser.add_argument("--engine",
+                       choices=["threads", "async"],
+                       default="threads",
+                       help="Fetch engine: thread pool or asyncio/aiohttp (default: threads)")
+    
+    parser.add_argument("--http2",
+                       action="store_true",
+                       help="Send requests over HTTP/2, many at a time on a few connections (threads engine, requires httpx[http2])")
+    
+    parser.add_argument("--ca-bundle",
+                       metavar="FILE",
+                       help="Trust the certificates in this PEM file for HTTPS, e.g. a local test server (default: system certificates)")
+    
+    parser.add_argument("--base-url",
+                       default="https://tass.com",
+                       metavar="URL",
+                       help="Base URL of the TASS site, e.g. a local mock server (default: https://tass.com)")
+    
+    parser.add_argument("--rate",
+                       type=float,
+                       default=None,
+                       metavar="RPS",
+                       help="Cap requests per second across all workers, replacing --min-delay/--max-delay (default: off)")
+    
+    parser.add_argument("--burst",
+                       type=int,
+                       default=1,
+                       metavar="N",
+                       help="Number of requests allowed in a burst when --rate is set (default: 1)")
+    
+    parser.add_argument("--jitter",
+                       type=float,
+                       default=0.2,
+                       metavar="SEC",
+                       help="Maximum random delay added to each request when --rate is set (default: 0.2)")
+    
+    parser.add_argument("--rate-per-host",
+                       action="store_true",
+                       help="Apply the --rate limit to each host separately")
+    
+    parser.add_argument("--incremental",
+                       action="store_true",
+                       help="Keep an article index in the output directory and only fetch articles not seen before")
+    
+    parser.add_argument("--archive-shard-mb",
+                       type=int,
+                       default=64,
+                       metavar="MB",
+                       help="Compressed size of an archive shard before a new one is started with --format archive (default: 64)")
+    
+    parser.add_argument("--index",
+                       action="store_true",
+                       help="Add scraped articles to a full-text search index (search.sqlite) for 'tass_scraper search'")
+    
+    parser.add_argument("--near-duplicates",
+                       action="store_true",
+                       help="Find near-duplicate articles and reused paragraphs, also across runs (near_duplicates.sqlite, requires numpy)")
+    
+    parser.add_argument("--similarity",
+                       type=float,
+                       default=0.8,
+                       metavar="S",
+                       help="Share of word sequences two articles need in common to count as near-duplicates (default: 0.8)")
+    
+    parser.add_argument("--watch",
+                       action="store_true",
+                       help="Keep running and fetch new articles as they are published, appending them to daily JSON Lines files")
+    
+    parser.add_argument("--watch-interval",
+                       type=float,
+                       default=60,
+                       metavar="SEC",
+                       help="Shortest time between two news list checks of a category in watch mode (default: 60)")
+    
+    parser.add_argument("--watch-max-interval",
+                       type=float,
+                       default=600,
+                       metavar="SEC",
+                       help="Longest time between two news list checks of a quiet category in watch mode (default: 600)")
+    
+    parser.add_argument("--join",
+                       default=None,
+                       metavar="QUEUE",
+                       help="Share the scraping with other scraper processes through the work queue file QUEUE")
+    
+    parser.add_argument("--lease-seconds",
+                       type=float,
+                       default=120,
+                       metavar="SEC",
+                       help="Time without a lease renewal before other workers take over a worker's tasks (default: 120)")
+    
+    parser.add_argument("--cache",
+                       action="store_true",
+                       help="Cache downloaded article pages in the output directory and revalidate them")
+    
+    parser.add_argument("--cache-ttl",
+                       type=int,
+                       default=86400,
+                       metavar="SEC",
+                       help="Seconds a cached page is used without revalidation (default: 86400)")
+    
+    parser.add_argument("--cache-max-mb",
+                       type=int,
+                       default=500,
+                       metavar="MB",
+                       help="Maximum size of the page cache, least recently used pages are evicted (default: 500)")
 
-    args = parser.parse_args()
+    args = parser.parse_args(sys.argv[2:] if backfill else None)
     
     config = NewsScraperConfig()
     config.headlines_per_category = args.headlines
+    config.page_size = args.page_size
     config.categories = args.categories
     config.use_csv = args.csv
+    config.output_format = args.format
     config.max_workers = args.workers
+    config.auto_workers = args.auto_workers
+    config.min_workers = args.min_workers
+    config.max_auto_workers = args.max_auto_workers
+    config.parse_procs = args.parse_procs
     config.output_dir = args.output_dir
     config.include_top_words = args.top_words
+    config.term_report = args.term_report
+    config.ngrams = args.ngrams
+    config.report_top = args.report_top
     config.min_delay = args.min_delay
     config.max_delay = args.max_delay
     config.max_retries = args.max_retries
+    config.parser = args.parser
+    config.stream = args.stream
+    config.connect_timeout = args.connect_timeout
+    config.read_timeout = args.read_timeout
+    config.deadline = args.deadline
+    config.hedge_percentile = args.hedge_percentile
+    config.engine = args.engine
+    config.http2 = args.http2
+    config.ca_bundle = args.ca_bundle
+    config.base_url = args.base_url.rstrip("/")
+    config.rate = args.rate
+    config.burst = args.burst
+    config.jitter = args.jitter
+    config.rate_per_host = args.rate_per_host
+    config.incremental = args.incremental
+    config.build_index = args.index
+    config.near_duplicates = args.near_duplicates
+    config.similarity = args.similarity
+    config.archive_shard_mb = args.archive_shard_mb
+    config.watch = args.watch
+    config.watch_interval = args.watch_interval
+    config.watch_max_interval = args.watch_max_interval
+    config.join = args.join
+    config.lease_seconds = args.lease_seconds
+    config.use_cache = args.cache
+    config.cache_ttl = args.cache_ttl
+    config.cache_max_mb = args.cache_max_mb
+    if backfill:
+        config.backfill_since = args.since
+        config.backfill_until = args.until
+        config.window_days = args.window_days
     
     try:
         scraper = NewsScraper(config)
@@ -632,4 +5067,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()